@@ -1,7 +1,8 @@
 from flask import Blueprint, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required, login_user, logout_user
+from database import use_primary
 from models import User, db
-from werkzeug.security import check_password_hash, generate_password_hash
+from security import authenticate, hash_password, invalidate_user, verify_password
 
 # Create blueprint for authentication routes
 auth = Blueprint("auth", __name__)
@@ -19,7 +20,7 @@ def login():
         user = User.query.filter_by(email=email).first()
         if user:
             # Check is password is correct
-            if check_password_hash(user.password, password):
+            if authenticate(user, password):
                 flash("Logged in successfully!", category="success")
                 login_user(user, remember=True)
                 return redirect(url_for("views.home"))  # Redirect user to home
@@ -69,7 +70,7 @@ def sign_up():
                 email=email,
                 first_name=first_name,
                 last_name=last_name,
-                password=generate_password_hash(password1, method="pbkdf2:sha256"),
+                password=hash_password(password1),
             )
             db.session.add(new_user)
             db.session.commit()
@@ -82,6 +83,7 @@ def sign_up():
 
 # Changing profile route, with both GET and POST methods
 @auth.route("/profile", methods=["GET", "POST"])
+@use_primary
 @login_required
 def profile():
     if request.method == "POST":
@@ -95,11 +97,12 @@ def profile():
         user = User.query.filter_by(email=email).first()
         if user:
             # Check if password is correct
-            if check_password_hash(user.password, password):
+            if verify_password(user.password, password):
                 # Update user's profile information
                 user.first_name = first_name
                 user.last_name = last_name
                 db.session.commit()  # Commit the changes to the database
+                invalidate_user(user.id)
 
                 flash("Profile updated successfully!", category="success")
                 return redirect(url_for("auth.profile"))  # Redirect to profile page
@@ -0,0 +1,258 @@
+"""
+Latency and throughput benchmark for the web views and experiment APIs.
+
+Drives home, experiments, transcription, analytics and every
+/api/experiment/<id>/... route, either in-process through the Flask test
+client or over HTTP against a running server, with a pool of concurrent
+clients. Reports p50/p95/p99 latency, throughput and queries per request
+(read from the X-Query-Profile header, so the app needs SQL_PROFILING=true;
+in-process runs enable it automatically).
+
+    DATABASE_URL=postgresql://postgres@localhost/tastelab_bench \
+        python -m benchmarks.run --requests 200 --concurrency 8 --save baseline
+
+    python -m benchmarks.run --url http://127.0.0.1:8000 --email a@b.c --password ... \
+        --exp-id 42 --compare baseline
+
+In-process runs refuse to start without DATABASE_URL, so the default
+database from config.py is never load-tested. HTTP runs need --exp-id, since
+the server's database can't be inspected from here.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+# /transcription selects its experiment with ?id=; /analytics always covers every experiment
+PAGE_ROUTES = ['/', '/experiments', '/transcription?id={exp_id}', '/analytics']
+
+
+def route_arguments():
+    """Values to expand for URL arguments other than exp_id; rules using others are skipped"""
+    from exports import EXPORT_DATASETS, EXPORT_FORMATS
+    return {'dataset': list(EXPORT_DATASETS), 'fmt': list(EXPORT_FORMATS)}
+
+
+def experiment_routes(app):
+    """
+    Every GET /api/experiment/<exp_id>... rule, so new endpoints are picked up.
+    Other URL arguments are expanded to each of their known values.
+    """
+    values = route_arguments()
+    routes = []
+    for rule in app.url_map.iter_rules():
+        if not rule.rule.startswith('/api/experiment/<int:exp_id>') or 'GET' not in rule.methods:
+            continue
+        arguments = sorted(rule.arguments - {'exp_id'})
+        if any(argument not in values for argument in arguments):
+            continue
+        route = rule.rule.replace('<int:exp_id>', '{exp_id}')
+        expanded = [route]
+        for argument in arguments:
+            placeholder = re.search(rf'<(?:[^:>]+:)?{argument}>', route).group(0)
+            expanded = [path.replace(placeholder, value)
+                        for path in expanded for value in values[argument]]
+        routes += expanded
+    return sorted(routes)
+
+
+def largest_experiment_id():
+    """The experiment with the most timeline segments, the worst case for every view"""
+    from models import NlpAnalysis
+    analysis = (NlpAnalysis.query
+                .filter(NlpAnalysis.experiment_id.isnot(None))
+                .order_by(NlpAnalysis.total_segments.desc())
+                .first())
+    if analysis is None:
+        sys.exit("No analysed experiments found; run python -m benchmarks.seed first.")
+    return analysis.experiment_id
+
+
+class TestClientDriver:
+    """In-process requests through Flask's test client, one client per thread"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def client(self):
+        return self.app.test_client()
+
+    @staticmethod
+    def get(client, path):
+        response = client.get(path)
+        response.close()
+        return response.status_code, response.headers.get('X-Query-Profile')
+
+
+class HttpDriver:
+    """Requests over HTTP, one cookie-carrying opener per thread"""
+
+    def __init__(self, base_url, email=None, password=None):
+        self.base_url = base_url.rstrip('/')
+        self.email = email
+        self.password = password
+
+    def client(self):
+        opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        if self.email:
+            form = urllib.parse.urlencode({'email': self.email, 'password': self.password}).encode()
+            opener.open(self.base_url + '/login', data=form).read()
+        return opener
+
+    def get(self, opener, path):
+        try:
+            with opener.open(self.base_url + path) as response:
+                response.read()
+                return response.status, response.headers.get('X-Query-Profile')
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+
+def _query_count(header):
+    if not header:
+        return None
+    fields = dict(part.strip().split('=', 1) for part in header.split(';'))
+    return int(fields['queries'])
+
+
+def bench_route(driver, path, requests, concurrency):
+    """Issue `requests` GETs for one path from `concurrency` clients at once"""
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0)
+                  for i in range(concurrency)]
+
+    def worker(count):
+        client = driver.client()
+        driver.get(client, path)  # warm-up, not measured
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            status, profile = driver.get(client, path)
+            samples.append((time.perf_counter() - started, status, _query_count(profile)))
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = [sample for batch in pool.map(worker, per_worker) for sample in batch]
+    wall = time.perf_counter() - started
+
+    latencies = np.array([seconds for seconds, _, _ in samples]) * 1000
+    queries = [count for _, _, count in samples if count is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status >= 400),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'mean_ms': round(float(latencies.mean()), 2),
+        'throughput_rps': round(len(samples) / wall, 1),
+        'queries_per_request': round(sum(queries) / len(queries), 1) if queries else None
+    }
+
+
+def print_report(results, baseline=None, tolerance=0.1):
+    """Table of results; with a baseline, p50/p95 deltas and regressions beyond tolerance"""
+    regressions = []
+    header = f"{'route':<52} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'q/req':>6} {'err':>4}"
+    if baseline:
+        header += f" {'Δp50':>7} {'Δp95':>7}"
+    print(header)
+    for path, stats in results.items():
+        line = (f"{path:<52} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+                f"{stats['throughput_rps']:>8} {str(stats['queries_per_request']):>6} {stats['errors']:>4}")
+        previous = (baseline or {}).get(path)
+        if previous:
+            deltas = [(stats[key] - previous[key]) / previous[key] if previous[key] else 0.0
+                      for key in ('p50_ms', 'p95_ms')]
+            line += ''.join(f" {delta:>+7.0%}" for delta in deltas)
+            if max(deltas) > tolerance:
+                regressions.append(path)
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process app')
+    parser.add_argument('--email')
+    parser.add_argument('--password')
+    parser.add_argument('--exp-id', type=int,
+                        help='experiment to use (default: the largest; required with --url)')
+    parser.add_argument('--requests', type=int, default=100, help='measured requests per route')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--only', help='only routes containing this substring')
+    parser.add_argument('--save', metavar='NAME', help='store the results as baselines/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='compare against baselines/NAME.json')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='relative p50/p95 increase counted as a regression (default 0.1)')
+    args = parser.parse_args(argv)
+
+    if args.url and not args.exp_id:
+        parser.error("--exp-id is required with --url: the largest experiment is only known locally")
+    if not args.url and 'DATABASE_URL' not in os.environ:
+        sys.exit("Set DATABASE_URL to a local benchmark database; refusing to load-test the default one.")
+
+    # The in-process app reports its query counts through the profiling header
+    os.environ.setdefault('SQL_PROFILING', 'true')
+    os.environ.setdefault('SLOW_REQUEST_MS', '60000')
+    from main import create_app
+    app = create_app()
+
+    with app.app_context():
+        exp_id = args.exp_id or largest_experiment_id()
+        routes = PAGE_ROUTES + experiment_routes(app)
+
+    if args.url:
+        driver = HttpDriver(args.url, args.email, args.password)
+    else:
+        app.config['LOGIN_DISABLED'] = True
+        driver = TestClientDriver(app)
+
+    results = {}
+    for route in routes:
+        if args.only and args.only not in route:
+            continue
+        path = route.format(exp_id=exp_id)
+        results[route] = bench_route(driver, path, args.requests, args.concurrency)
+
+    baseline = None
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json")) as f:
+            baseline = json.load(f)['results']
+
+    print(f"experiment {exp_id}, {args.requests} requests x {len(results)} routes, "
+          f"concurrency {args.concurrency}, {'HTTP ' + args.url if args.url else 'test client'}")
+    regressions = print_report(results, baseline, args.tolerance)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, f"{args.save}.json"), 'w') as f:
+            json.dump({
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'exp_id': exp_id,
+                'requests': args.requests,
+                'concurrency': args.concurrency,
+                'target': args.url or 'test-client',
+                'results': results
+            }, f, indent=2)
+
+    if regressions:
+        print(f"\n{len(regressions)} route(s) slower than the baseline by more than "
+              f"{args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Seed a local Postgres with synthetic experiments for the web benchmarks.
+
+Every analysis goes through sync.data_import.insert_analysis_data, so the
+derived tables (chart pyramid, keyword index, topic statistics, emotion
+transitions) look exactly like imported data.
+
+    DATABASE_URL=postgresql://postgres@localhost/tastelab_bench \
+        python -m benchmarks.seed --experiments 500 --segments 4000
+
+500 x 4000 gives two million timeline segments.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+EMOTIONS = ['neutral', 'joy', 'surprise', 'sadness', 'anger', 'disgust', 'fear']
+TAGS = ['Sweet', 'Salty', 'Sour', 'Bitter', 'Umami', 'Snack', 'Beverage', 'Dairy', 'Plant-based']
+WORDS = ('taste texture sweet salty sour bitter crunchy creamy soft smell aroma '
+         'flavour aftertaste strong mild fresh dry juicy spicy rich light really '
+         'quite like dislike prefer nice bit too not very this that sample first second').split()
+TOPICS = ['taste', 'texture', 'smell', 'salt', 'sweet', 'aftertaste', 'packaging', 'price']
+
+# How likely the emotion stays the same between segments
+EMOTION_STICKINESS = 0.8
+
+
+def _sentence(rng, low=6, high=14):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + '.'
+
+
+def _emotion_vector(rng, primary):
+    weights = {emotion: rng.random() * 0.2 for emotion in EMOTIONS}
+    weights[primary] = 0.5 + rng.random() * 0.5
+    total = sum(weights.values())
+    return {emotion: round(weight / total, 4) for emotion, weight in weights.items()}
+
+
+def synthetic_session(rng, segments):
+    """A session_data dict shaped like the MinIO analysis JSON files"""
+    emotion = 'neutral'
+    detailed = []
+    for _ in range(segments):
+        if rng.random() > EMOTION_STICKINESS:
+            emotion = rng.choice(EMOTIONS)
+        score = round(rng.uniform(-1, 1), 3)
+        detailed.append({
+            'text': _sentence(rng),
+            'primary_emotion': emotion,
+            'dialogue_emotions': _emotion_vector(rng, emotion),
+            'sentiment': {'label': 'positive' if score > 0 else 'negative', 'score': score}
+        })
+
+    counts = {e: 0 for e in EMOTIONS}
+    for segment in detailed:
+        counts[segment['primary_emotion']] += 1
+    percentages = {e: round(c / segments * 100, 2) for e, c in counts.items()}
+    words = segments * 10
+
+    return {
+        'sentiment': {
+            'analyzed_at': datetime.now().isoformat(),
+            'model_used': 'synthetic-benchmark',
+            'summary': {
+                'total_segments': segments,
+                'dominant_emotion': max(counts, key=counts.get),
+                'emotion_percentages': percentages,
+                'emotion_counts': counts,
+                'primary_emotion_counts': counts
+            },
+            'detailed_analyses': detailed
+        },
+        'insights': {
+            'reading_time_minutes': round(words / 230, 1),
+            'counts': {'words': words, 'unique_words': len(WORDS)},
+            'lexical_diversity': round(len(WORDS) / words, 4),
+            'topics': [[topic, rng.randint(1, 50)] for topic in rng.sample(TOPICS, 5)],
+            'sentiment_summary': {
+                'questions_detected': {'questions_by_time': [
+                    {'question_text': _sentence(rng, 4, 8)[:-1] + '?', 'pattern_matched': 'what',
+                     'position': rng.randint(0, words), 'confidence': round(rng.random(), 2)}
+                    for _ in range(rng.randint(3, 20))
+                ]},
+                'action_items_detected': {'actions_by_time': [
+                    {'action_text': _sentence(rng, 4, 8), 'pattern_matched': 'should',
+                     'position': rng.randint(0, words), 'confidence': round(rng.random(), 2)}
+                    for _ in range(rng.randint(3, 20))
+                ]}
+            },
+            'top_bigrams': [[f"{rng.choice(WORDS)} {rng.choice(WORDS)}", rng.randint(2, 40)] for _ in range(20)],
+            'top_trigrams': [[_sentence(rng, 3, 3)[:-1].lower(), rng.randint(2, 20)] for _ in range(20)],
+            'important_sentences': [_sentence(rng, 10, 25) for _ in range(10)],
+            'text_statistics': {'avg_sentence_length_tokens': 10.0, 'avg_word_length': 5.2}
+        },
+        'keyword_cloud': {'keywords': [
+            {'text': word, 'value': rng.randint(1, 200), 'tf_idf_score': round(rng.random(), 4),
+             'relevance_score': round(rng.random(), 4)}
+            for word in rng.sample(WORDS, 30)
+        ]},
+        'summary': {
+            'final_summary_preview': ' '.join(_sentence(rng) for _ in range(5)),
+            'length_profile': 'medium',
+            'num_segments': segments
+        }
+    }
+
+
+def seed(experiments, segments, seed_value=42, prefix='Benchmark'):
+    from models import db, Experiment
+    from sync.data_import import insert_analysis_data
+
+    rng = random.Random(seed_value)
+    start_date = datetime(2025, 1, 1)
+    started = time.time()
+
+    for number in range(1, experiments + 1):
+        # insert_analysis_data links the analysis to this experiment by title
+        video_name = f"{prefix.lower()}_{number:05d}"
+        title = f"{prefix} {number:05d}"
+        if Experiment.query.filter_by(title=title).first():
+            continue
+
+        date = start_date + timedelta(days=rng.randint(0, 364))
+        db.session.add(Experiment(
+            title=title,
+            description=f"Synthetic benchmark session {number}",
+            date=date,
+            tags=', '.join(rng.sample(TAGS, rng.randint(1, 3))),
+            participant_count=rng.randint(1, 30),
+            duration=max(1, segments // 12),
+            status=rng.choice(['Completed', 'Completed', 'Archived'])
+        ))
+        db.session.commit()
+
+        session_data = synthetic_session(rng, rng.randint(segments // 2, segments * 3 // 2))
+        if not insert_analysis_data(session_data, date.strftime('%Y-%m-%d'), 'benchmark', video_name):
+            raise RuntimeError(f"Import failed for {video_name}")
+
+        if number % 10 == 0 or number == experiments:
+            print(f"{number}/{experiments} experiments seeded ({time.time() - started:.0f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--experiments', type=int, default=100)
+    parser.add_argument('--segments', type=int, default=2000,
+                        help='mean timeline segments per analysis (each varies by +/-50%%)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prefix', default='Benchmark')
+    args = parser.parse_args(argv)
+
+    if 'DATABASE_URL' not in os.environ:
+        sys.exit("Set DATABASE_URL to a local benchmark database; refusing to seed the default one.")
+
+    from main import create_app
+    app = create_app()
+    with app.app_context():
+        seed(args.experiments, args.segments, args.seed, args.prefix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Cold-start benchmark for web workers.
+
+Boots the WSGI app (wsgi.py, i.e. create_app(migrations=False)) in fresh
+interpreters under `python -X importtime` and reports the median process
+wall time, time to a ready app and total import time, plus the packages
+that cost the most. Fails when a heavy optional dependency is imported at
+boot: those must stay behind first-use imports.
+
+Workers boot with the production configuration, so static precompression is
+measured unless STATIC_PRECOMPRESS is set. The first boot writes the
+compressed copies and is reported on its own; later boots only hash the
+static tree. A second set of boots without precompression shows its share.
+
+    python -m benchmarks.startup --runs 7 --save baseline
+    python -m benchmarks.startup --compare baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Never needed to serve a request: analytics, Parquet exports, MinIO sync, scheduler, migrations
+HEAVY_MODULES = ('numpy', 'scipy', 'sklearn', 'librosa', 'numba', 'cv2', 'polars',
+                 'minio', 'apscheduler', 'flask_apscheduler', 'alembic', 'flask_migrate')
+
+# Boots without the static precompression pass, to show what it costs per worker
+WITHOUT_PRECOMPRESS = {'STATIC_PRECOMPRESS': 'false'}
+
+BOOT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from wsgi import app
+boot = time.perf_counter() - started
+print(json.dumps({'boot_ms': boot * 1000,
+                  'heavy': sorted(set(sys.argv[1:]) & set(sys.modules))}))
+"""
+
+
+def parse_importtime(stderr):
+    """Total import time and self time per top-level package, both in ms"""
+    per_package = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, self_us, _, name = (part.strip() for part in line.replace(':', '|', 1).split('|'))
+        per_package[name.split('.')[0]] += int(self_us) / 1000
+    return sum(per_package.values()), per_package
+
+
+def boot_once(compressed_dir, overrides=None):
+    env = dict(os.environ, STATIC_COMPRESSED_DIR=compressed_dir, **(overrides or {}))
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT, *HEAVY_MODULES],
+                            cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    wall = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        sys.exit(f"App failed to boot:\n{result.stderr[-2000:]}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    imports_ms, per_package = parse_importtime(result.stderr)
+    return wall, report['boot_ms'], imports_ms, per_package, report['heavy']
+
+
+def measure(runs, compressed_dir, overrides=None):
+    samples = [boot_once(compressed_dir, overrides) for _ in range(runs)]
+    packages = Counter()
+    for _, _, _, per_package, _ in samples:
+        packages.update(per_package)
+    return {
+        'wall_ms': round(statistics.median(s[0] for s in samples), 1),
+        'boot_ms': round(statistics.median(s[1] for s in samples), 1),
+        'imports_ms': round(statistics.median(s[2] for s in samples), 1),
+        'top_packages': {name: round(ms / runs, 1) for name, ms in packages.most_common(12)},
+        'heavy_modules': sorted({name for s in samples for name in s[4]})
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to boot')
+    parser.add_argument('--save', metavar='NAME', help='store the results as baselines/startup-NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='compare against baselines/startup-NAME.json')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative boot time increase counted as a regression (default 0.2)')
+    args = parser.parse_args(argv)
+
+    # A fresh compressed-copy folder, so the first boot does the full precompression
+    with tempfile.TemporaryDirectory() as compressed_dir:
+        first_boot_ms = boot_once(compressed_dir)[1]
+        results = measure(args.runs, compressed_dir)
+        without = measure(args.runs, compressed_dir, WITHOUT_PRECOMPRESS)
+    results['first_boot_ms'] = round(first_boot_ms, 1)
+    results['without_precompress'] = {key: without[key] for key in ('wall_ms', 'boot_ms', 'imports_ms')}
+
+    print(f"median of {args.runs} cold starts (first boot {results['first_boot_ms']} ms)")
+    print(f"  {'':<12} {'prod':>8} {'no precompress':>15}")
+    for key in ('wall_ms', 'boot_ms', 'imports_ms'):
+        print(f"  {key:<12} {results[key]:>8} {without[key]:>15}")
+    print("slowest packages (self import time, ms)")
+    for name, ms in results['top_packages'].items():
+        print(f"  {name:<24} {ms:>8}")
+
+    failed = False
+    if results['heavy_modules']:
+        print(f"\nHeavy modules imported at boot: {', '.join(results['heavy_modules'])}")
+        failed = True
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"startup-{args.compare}.json")) as f:
+            baseline = json.load(f)['results']
+        delta = (results['boot_ms'] - baseline['boot_ms']) / baseline['boot_ms']
+        print(f"\nboot_ms {baseline['boot_ms']} -> {results['boot_ms']} ({delta:+.0%})")
+        if delta > args.tolerance:
+            print(f"Boot time regressed by more than {args.tolerance:.0%}")
+            failed = True
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, f"startup-{args.save}.json"), 'w') as f:
+            json.dump({
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': sys.version.split()[0],
+                'runs': args.runs,
+                'results': results
+            }, f, indent=2)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
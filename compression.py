@@ -0,0 +1,203 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import tempfile
+import zlib
+
+from flask import abort, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+# Static file types worth precompressing (images are already compressed)
+PRECOMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.json', '.txt', '.map')
+
+# One year, the usual ceiling for far-future caching
+STATIC_MAX_AGE = 31536000
+
+COMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def _accepted_encoding():
+    """Pick the best encoding the client accepts: br > gzip > none"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level)
+
+
+def _gzip_stream(iterable, level):
+    """Compress a streamed body chunk by chunk, keeping memory per chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in iterable:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response):
+    """after_request hook: gzip/brotli eligible dynamic responses"""
+    config = current_app.config
+
+    if (response.status_code < 200 or response.status_code >= 300
+            or response.status_code == 204
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in config['COMPRESS_MIMETYPES']):
+        return response
+
+    # File responses (static) are handled by the precompressed variants
+    if response.direct_passthrough:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    level = config['COMPRESS_LEVEL']
+
+    # Streamed responses are compressed on the fly with gzip
+    if response.is_streamed:
+        if not request.accept_encodings['gzip']:
+            return response
+        response.response = _gzip_stream(response.response, level)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers.pop('Content-Length', None)
+        _weaken_etag(response)
+        return response
+
+    data = response.get_data()
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = _accepted_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(_compress(data, encoding, level))
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
+
+
+def _weaken_etag(response):
+    # A compressed body is a different representation, so a strong ETag no longer holds
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def precompress_static(static_folder, output_folder, level=9):
+    """
+    Write .gz (and .br when available) copies of compressible static files to
+    output_folder, mirroring the static tree, and return a manifest of
+    {relative path: content fingerprint}. The source tree is never written to;
+    existing compressed copies are only rebuilt when the source is newer.
+    """
+    manifest = {}
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if name.endswith(tuple(COMPRESSED_SUFFIXES.values())):
+                continue
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, static_folder).replace(os.sep, '/')
+
+            with open(path, 'rb') as f:
+                data = f.read()
+            manifest[rel_path] = hashlib.md5(data).hexdigest()[:12]
+
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+
+            encodings = ['gzip'] + (['br'] if brotli is not None else [])
+            for encoding in encodings:
+                target = os.path.join(output_folder, rel_path + COMPRESSED_SUFFIXES[encoding])
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, 'wb') as f:
+                    f.write(_compress(data, encoding, level))
+
+    return manifest
+
+
+def init_compression(app):
+    """Register response compression and fingerprinted, precompressed static serving"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_MIMETYPES', [
+        'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+        'application/javascript', 'application/json', 'application/x-ndjson',
+        'image/svg+xml'
+    ])
+    app.config.setdefault('STATIC_PRECOMPRESS', True)
+    app.config.setdefault('STATIC_COMPRESSED_DIR',
+                          os.path.join(tempfile.gettempdir(), 'tastelab-static'))
+
+    app.after_request(compress_response)
+
+    compressed_folder = app.config['STATIC_COMPRESSED_DIR']
+    manifest = {}
+    if app.config['STATIC_PRECOMPRESS'] and app.static_folder:
+        manifest = precompress_static(app.static_folder, compressed_folder)
+    app.extensions['static_manifest'] = manifest
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        # url_for('static', ...) gets ?v=<hash> so the URL changes with the content
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            fingerprint = manifest.get(values['filename'])
+            if fingerprint:
+                values['v'] = fingerprint
+
+    def serve_static(filename):
+        # Compressed copies are only served through content negotiation
+        if filename.endswith(tuple(COMPRESSED_SUFFIXES.values())):
+            abort(404)
+
+        encoding = _accepted_encoding()
+        source = safe_join(app.static_folder, filename)
+        variant = None
+        if encoding and source and os.path.isfile(source):
+            variant = safe_join(compressed_folder, filename + COMPRESSED_SUFFIXES[encoding])
+        # A copy older than its source (e.g. from a previous build) is ignored
+        if (variant and os.path.isfile(variant)
+                and os.path.getmtime(variant) >= os.path.getmtime(source)):
+            response = send_from_directory(compressed_folder,
+                                           filename + COMPRESSED_SUFFIXES[encoding])
+            # Keep the original file's type, not application/gzip, and no download name
+            response.headers['Content-Encoding'] = encoding
+            response.headers.pop('Content-Disposition', None)
+            response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        else:
+            response = send_from_directory(app.static_folder, filename)
+        # Also on 304s, so caches keep the encodings apart
+        response.vary.add('Accept-Encoding')
+
+        fingerprint = manifest.get(filename)
+        if fingerprint and request.args.get('v') == fingerprint:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = serve_static
+
+    @app.cli.command('compress-static')
+    def compress_static_command():
+        """Precompress and fingerprint static assets ahead of deployment"""
+        result = precompress_static(app.static_folder, compressed_folder)
+        print(f"Precompressed static assets ({len(result)} files fingerprinted)")
@@ -1,4 +1,11 @@
 import os
+import tempfile
+from database import REPLICA_BIND, engine_options
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() in ('true', '1', 't')
+
 
 class Config:
     SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'default-dev-key')
@@ -7,9 +14,71 @@ class Config:
         'postgresql://postgres.zuhfvnelpteuhqnbyzfc:[+6F&U/8U2jfPw5d]@aws-1-eu-west-1.pooler.supabase.com:5432/postgres'
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # argon2id password hashing cost (memory in KiB); existing hashes are
+    # upgraded on the next login when these change
+    ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 3))
+    ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 65536))
+    ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 4))
+
+    # Seconds a worker reuses a loaded user for current_user (0 disables)
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 30))
+
+    # Connection pool. Set DB_TRANSACTION_POOLER when DATABASE_URL points at a
+    # transaction-mode pooler (Supabase port 6543 / PgBouncer)
+    DB_TRANSACTION_POOLER = _env_flag('DB_TRANSACTION_POOLER', 'False')
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+    _pool = dict(
+        pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        pool_pre_ping=_env_flag('DB_POOL_PRE_PING', 'True'),
+        statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
+        transaction_pooler=DB_TRANSACTION_POOLER
+    )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, **_pool)
+
+    # Optional read replica: read-only requests query it, writes and sync use the primary
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {
+        REPLICA_BIND: {
+            'url': DATABASE_REPLICA_URL,
+            **engine_options(DATABASE_REPLICA_URL, **_pool, read_only=True)
+        }
+    } if DATABASE_REPLICA_URL else {}
+    del _pool
+
+    # Threads for concurrent dashboard queries (0 runs them sequentially);
+    # keep below DB_POOL_SIZE + DB_MAX_OVERFLOW
+    QUERY_FANOUT_WORKERS = int(os.getenv('QUERY_FANOUT_WORKERS', 6))
+
+    # Opt-in request profiling: X-Query-Profile / Server-Timing headers, a log
+    # of slow requests and repeated (N+1) queries, and profiler dumps in PROFILE_DIR
+    SQL_PROFILING = _env_flag('SQL_PROFILING', 'False')
+    SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 500))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+    PROFILE_DIR = os.getenv('PROFILE_DIR')
+    PROFILER = os.getenv('PROFILER', 'cprofile')  # or 'pyinstrument' when installed
+
+    # Rendered experiment cards / selector options kept per worker, and the
+    # directory for compiled Jinja templates (empty disables it)
+    FRAGMENT_CACHE_SIZE = int(os.getenv('FRAGMENT_CACHE_SIZE', 2000))
+    JINJA_CACHE_DIR = os.getenv('JINJA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'tastelab-jinja'))
+
+    # Browser cache lifetime (seconds) for immutable analysis API responses
+    ANALYSIS_CACHE_MAX_AGE = int(os.getenv('ANALYSIS_CACHE_MAX_AGE', 86400))
+
+    # Response compression (bodies smaller than this are sent as-is)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    STATIC_PRECOMPRESS = _env_flag('STATIC_PRECOMPRESS', 'True')
+    # Where .gz/.br copies of static files are written, outside the source tree
+    STATIC_COMPRESSED_DIR = os.getenv('STATIC_COMPRESSED_DIR',
+                                      os.path.join(tempfile.gettempdir(), 'tastelab-static'))
     
     MINIO_ENDPOINT = os.getenv('MINIO_ENDPOINT', "194.171.191.226:3135")
     MINIO_ACCESS_KEY = os.getenv('MINIO_ACCESS_KEY', "tastelab_admin")
     MINIO_SECRET_KEY = os.getenv('MINIO_SECRET_KEY', "tastelabpassword123")
-    MINIO_SECURE = os.getenv('MINIO_SECURE', 'False').lower() in ('true', '1', 't')
+    MINIO_SECURE = _env_flag('MINIO_SECURE', 'False')
     MINIO_BUCKET = os.getenv('MINIO_BUCKET', 'tastelab-videos-processed')
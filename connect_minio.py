@@ -1,6 +1,6 @@
 from sync.data_import import insert_analysis_data, find_or_create_experiment
 import json
-from main import app
+from flask import current_app
 from minio import Minio
 from datetime import datetime
 from models import (db, NlpAnalysis, EmotionSummary, TimelineSegment, ChartBin,
@@ -8,27 +8,28 @@ from models import (db, NlpAnalysis, EmotionSummary, TimelineSegment, ChartBin,
                     DetectedAction, TextInsight, Experiment)
 from db_names import Tables, Columns
 
-# Retrieve MinIO settings from the Flask application configuration
-MINIO_ENDPOINT = app.config['MINIO_ENDPOINT']
-MINIO_ACCESS_KEY = app.config['MINIO_ACCESS_KEY']
-MINIO_SECRET_KEY = app.config['MINIO_SECRET_KEY']
-MINIO_SECURE = app.config['MINIO_SECURE']
-MINIO_BUCKET = app.cofnig['MINIO_BUCKET']
+_client = None
 
-# Initialize MinIO client using the configuration
-client = Minio(
-    endpoint=MINIO_ENDPOINT,
-    access_key=MINIO_ACCESS_KEY,
-    secret_key=MINIO_SECRET_KEY,
-    secure=MINIO_SECURE
-)
+
+def get_client():
+    """MinIO client from the app's MINIO_* settings, built on first use"""
+    global _client
+    if _client is None:
+        config = current_app.config
+        _client = Minio(
+            endpoint=config['MINIO_ENDPOINT'],
+            access_key=config['MINIO_ACCESS_KEY'],
+            secret_key=config['MINIO_SECRET_KEY'],
+            secure=config['MINIO_SECURE']
+        )
+    return _client
 
 def list_sessions(bucket_name="tastelab-videos-processed"):
     """List all available sessions"""
     sessions = {}
     
     try:
-        objects = client.list_objects(bucket_name, recursive=True)
+        objects = get_client().list_objects(bucket_name, recursive=True)
         
         for obj in objects:
             path = obj.object_name
@@ -62,7 +63,7 @@ def read_json_from_minio(bucket_name, object_name):
     """Read and parse JSON file from MinIO"""
     response = None
     try:
-        response = client.get_object(bucket_name, object_name)
+        response = get_client().get_object(bucket_name, object_name)
         json_bytes = response.read()
         json_data = json.loads(json_bytes.decode('utf-8'))
         return json_data
@@ -466,7 +467,7 @@ def main():
     print(f"\n2. Selected: {session_key} ({len(video_names)} videos)")
     
     print("\n3. Preparing database...")
-    with app.app_context():
+    with current_app.app_context():
         db.create_all()
         print("✓ Tables ready")
         
@@ -529,4 +530,6 @@ if __name__ == "__main__":
     print("\nStarting MinIO Import...")
     print("This will automatically create or link to experiments!")
     print("="*80)
-    main()
\ No newline at end of file
+    from main import create_app
+    with create_app().app_context():
+        main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+from functools import wraps
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+
+# Bind key of the optional read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def engine_options(url, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800,
+                   pool_pre_ping=True, statement_timeout_ms=0, transaction_pooler=False,
+                   read_only=False):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a Postgres URL (other URLs keep the defaults).
+
+    Behind a transaction-mode pooler (PgBouncer, Supabase port 6543) the pooler
+    owns the connections: the app keeps none of its own (NullPool) and cannot
+    pass startup parameters, so the statement timeout is applied per
+    transaction instead (see init_engines).
+    """
+    if not url.startswith('postgresql'):
+        return {}
+    if transaction_pooler:
+        return {'poolclass': NullPool}
+
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': pool_pre_ping,
+    }
+    settings = []
+    if statement_timeout_ms:
+        settings.append(f'-c statement_timeout={statement_timeout_ms}')
+    if read_only:
+        settings.append('-c default_transaction_read_only=on')
+    if settings:
+        options['connect_args'] = {'options': ' '.join(settings)}
+    return options
+
+
+def init_engines(app, db):
+    """Per-transaction statement timeout for engines behind a transaction pooler"""
+    timeout = app.config.get('DB_STATEMENT_TIMEOUT_MS')
+    if not (app.config.get('DB_TRANSACTION_POOLER') and timeout):
+        return
+
+    def set_statement_timeout(connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'postgresql':
+                event.listen(engine, 'begin', set_statement_timeout)
+
+
+def use_primary(view):
+    """
+    Pin every query of a view to the primary, e.g. read-your-writes pages.
+    Apply it above @login_required so the current user is loaded from the
+    primary too.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_use_primary = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _reads_from_replica():
+    """Replica only for read-only HTTP requests; sync jobs and CLI have no request"""
+    if not has_request_context():
+        return False
+    return request.method in READ_ONLY_METHODS and not g.get('db_use_primary', False)
+
+
+class RoutingSession(Session):
+    """
+    Sends queries of read-only requests to the replica bind when one is
+    configured. Flushes, write requests and work outside a request
+    (scheduler, CLI) always use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _reads_from_replica():
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -11,6 +11,10 @@ class Tables:
     DETECTED_QUESTIONS = "detected_questions"
     DETECTED_ACTIONS = "detected_actions"
     TEXT_INSIGHTS = "text_insights"
+    KEYWORD_ROLLUPS = "keyword_rollups"
+    KEYWORD_POSTINGS = "keyword_postings"
+    SYNC_JOBS = "sync_jobs"
+    EMOTION_TRENDS = "emotion_trends"
 
 
 class Columns:
@@ -61,6 +65,7 @@ class Columns:
     END_TIME = "end_time"
     SEGMENT_DURATION = "segment_duration"
     TEXT_CONTENT = "text_content"
+    TEXT_SEARCH = "text_search"
     PRIMARY_EMOTION = "primary_emotion"
     SENTIMENT_LABEL = "sentiment_label"
     SENTIMENT_SCORE = "sentiment_score"
@@ -71,6 +76,8 @@ class Columns:
     BIN_INDEX = "bin_index"
     FORMATTED_START = "formatted_start"
     FORMATTED_END = "formatted_end"
+    MEAN_CONFIDENCE = "mean_confidence"
+    RESOLUTION = "resolution"
 
     # transcript summary
     CONTENT = "content"
@@ -84,6 +91,25 @@ class Columns:
     TF_IDF = "tf_idf_score"
     RELEVANCE_SCORE = "relevance_score"
 
+    # keyword index
+    SCOPE = "scope"
+    SCOPE_KEY = "scope_key"
+    TERM = "term"
+    DOCUMENT_FREQUENCY = "document_frequency"
+    TOTAL_COUNT = "total_count"
+    RELEVANCE_SUM = "relevance_sum"
+
+    # emotion trends
+    GRANULARITY = "granularity"
+    BUCKET_START = "bucket_start"
+    EMOTION = "emotion"
+    EXPERIMENT_COUNT = "experiment_count"
+    SEGMENT_COUNT = "segment_count"
+    CONFIDENCE_SUM = "confidence_sum"
+    SENTIMENT_SUM = "sentiment_sum"
+    POSITIVE_SEGMENTS = "positive_segments"
+    NEGATIVE_SEGMENTS = "negative_segments"
+
     # topic sentiment
     TOPIC_NAME = "topic_name"
     AVERAGE_CONFIDENCE = "average_confidence"
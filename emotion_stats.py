@@ -0,0 +1,145 @@
+import re
+
+import numpy as np
+
+
+def transition_statistics(emotions):
+    """
+    Markov transition statistics for an ordered sequence of primary emotions,
+    computed with array operations instead of per-segment loops.
+
+    Returns (transitions, stability_score) where transitions holds the label
+    order, transition counts and row-normalised probabilities, the
+    self-transition rate and run-length statistics. stability_score is the
+    self-transition rate, i.e. how often the emotion stays the same between
+    consecutive segments. Returns (None, None) for an empty sequence.
+    """
+    emotions = [emotion or 'neutral' for emotion in emotions]
+    if not emotions:
+        return None, None
+
+    labels, codes = np.unique(np.asarray(emotions), return_inverse=True)
+    k = len(labels)
+
+    # Transition counts: encode each consecutive (from, to) pair as from * k + to
+    pairs = codes[:-1] * k + codes[1:]
+    counts = np.bincount(pairs, minlength=k * k).reshape(k, k)
+    row_totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probabilities = np.where(row_totals > 0, counts / row_totals, 0.0)
+
+    total_transitions = int(counts.sum())
+    self_transitions = int(np.trace(counts))
+    self_rate = self_transitions / total_transitions if total_transitions else 1.0
+
+    # Runs of the same emotion: a new run starts wherever the code changes
+    starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    lengths = np.diff(np.append(starts, len(codes)))
+    run_codes = codes[starts]
+
+    per_emotion = {}
+    for code, label in enumerate(labels):
+        emotion_runs = lengths[run_codes == code]
+        if emotion_runs.size:
+            per_emotion[str(label)] = {
+                'runs': int(emotion_runs.size),
+                'mean_length': round(float(emotion_runs.mean()), 3),
+                'max_length': int(emotion_runs.max())
+            }
+
+    transitions = {
+        'labels': [str(label) for label in labels],
+        'counts': counts.tolist(),
+        'probabilities': np.round(probabilities, 4).tolist(),
+        'total_transitions': total_transitions,
+        'self_transition_rate': round(self_rate, 4),
+        'runs': {
+            'count': int(lengths.size),
+            'mean_length': round(float(lengths.mean()), 3),
+            'median_length': float(np.median(lengths)),
+            'max_length': int(lengths.max()),
+            'per_emotion': per_emotion
+        }
+    }
+    return transitions, round(self_rate, 4)
+
+
+def topic_statistics(topic_names, texts, emotions, confidences, starts, ends, samples=3):
+    """
+    Per-topic sentiment aggregates. Segments are mapped to topics in a single
+    regex pass over the segment texts, giving a (segments x topics) membership
+    matrix; every statistic is then a matrix operation over that mask.
+
+    Returns one dict per topic (in input order) with dominant_emotion,
+    average_confidence, emotion_diversity (Shannon entropy normalised to 0..1),
+    time_span_seconds, matched_segments and sample_segments.
+    """
+    n_topics = len(topic_names)
+    empty = [{
+        'dominant_emotion': 'neutral',
+        'average_confidence': 0.0,
+        'emotion_diversity': 0.0,
+        'time_span_seconds': 0.0,
+        'matched_segments': 0,
+        'sample_segments': []
+    } for _ in range(n_topics)]
+    if not n_topics or not texts:
+        return empty
+
+    # One alternation for all topics, longest first so "sea salt" wins over "salt";
+    # short suffixes are allowed so "salt" also matches "salty" / "salted".
+    # Topics differing only in case share one alternative but each keep their
+    # column; blank names would match everywhere and are left out
+    lookup = {}
+    for idx, name in enumerate(topic_names):
+        name = (name or '').strip()
+        if name:
+            lookup.setdefault(name.casefold(), (name, []))[1].append(idx)
+    if not lookup:
+        return empty
+    names = sorted((name for name, _ in lookup.values()), key=len, reverse=True)
+    pattern = re.compile(
+        r'\b(' + '|'.join(re.escape(name) for name in names) + r')\w{0,3}\b',
+        re.IGNORECASE
+    )
+    mask = np.zeros((len(texts), n_topics), dtype=bool)
+    for row, text in enumerate(texts):
+        for match in pattern.findall(text or ''):
+            # IGNORECASE and casefold() disagree on a few characters (e.g. 'İ'); skip those
+            _, columns = lookup.get(match.casefold(), (None, []))
+            mask[row, columns] = True
+
+    labels, codes = np.unique(np.asarray([e or 'neutral' for e in emotions]), return_inverse=True)
+    onehot = np.eye(len(labels), dtype=np.int64)[codes]
+    confidences = np.asarray([c if c is not None else 0.0 for c in confidences], dtype=float)
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+
+    matched = mask.sum(axis=0)
+    emotion_counts = mask.T.astype(np.int64) @ onehot          # topics x emotions
+    confidence_sums = mask.T.astype(float) @ confidences
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probabilities = emotion_counts / matched[:, None]
+        plogp = np.where(probabilities > 0, probabilities * np.log2(probabilities), 0.0)
+    entropy = np.maximum(-plogp.sum(axis=1), 0.0)
+    max_entropy = np.log2(len(labels)) if len(labels) > 1 else 1.0
+
+    first_start = np.where(mask, starts[:, None], np.inf).min(axis=0)
+    last_end = np.where(mask, ends[:, None], -np.inf).max(axis=0)
+
+    stats = []
+    for idx in range(n_topics):
+        if not matched[idx]:
+            stats.append(empty[idx])
+            continue
+        sample_rows = np.flatnonzero(mask[:, idx])[:samples]
+        stats.append({
+            'dominant_emotion': str(labels[emotion_counts[idx].argmax()]),
+            'average_confidence': round(float(confidence_sums[idx] / matched[idx]), 4),
+            'emotion_diversity': round(float(entropy[idx] / max_entropy), 4),
+            'time_span_seconds': round(float(last_end[idx] - first_start[idx]), 2),
+            'matched_segments': int(matched[idx]),
+            'sample_segments': [(texts[row] or '')[:200] for row in sample_rows]
+        })
+    return stats
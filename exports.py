@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from sqlalchemy import any_, func, literal, select
+from models import (
+    db, ChartBin, DetectedAction, DetectedQuestion, Experiment, Keyword, NlpAnalysis,
+    TimelineSegment
+)
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK = 5000
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+# dataset -> (model, [(column, kind)], order columns). kind is int / float / str / json;
+# json columns are written as JSON text in both formats
+EXPORT_DATASETS = {
+    'segments': (TimelineSegment, [
+        ('segment_index', 'int'), ('start_time', 'float'), ('end_time', 'float'),
+        ('duration', 'float'), ('primary_emotion', 'str'), ('sentiment_label', 'str'),
+        ('sentiment_score', 'float'), ('confidence_score', 'float'),
+        ('text_content', 'str'), ('emotion_vector', 'json')
+    ], ('start_time',)),
+    'chart_bins': (ChartBin, [
+        ('resolution', 'float'), ('bin_index', 'int'), ('start_time', 'float'),
+        ('end_time', 'float'), ('dominant_emotion', 'str'), ('mean_confidence', 'float'),
+        ('emotion_counts', 'json'), ('emotion_percentages', 'json')
+    ], ('resolution', 'bin_index')),
+    'keywords': (Keyword, [
+        ('rank', 'int'), ('text', 'str'), ('value', 'int'),
+        ('tf_idf_score', 'float'), ('relevance_score', 'float')
+    ], ('rank',)),
+    'questions': (DetectedQuestion, [
+        ('position_index', 'int'), ('question_text', 'str'),
+        ('pattern_matched', 'str'), ('confidence', 'float')
+    ], ('position_index',)),
+    'actions': (DetectedAction, [
+        ('position_index', 'int'), ('action_text', 'str'),
+        ('pattern_matched', 'str'), ('confidence', 'float')
+    ], ('position_index',)),
+}
+
+KEY_COLUMNS = [('experiment_id', 'int'), ('analysis_id', 'int')]
+
+
+def has_tag(tag):
+    """
+    Whole-tag match on the comma-separated Experiment.tags, trimmed the same way
+    the keyword and trend rollups split them (so "Sweet" doesn't match "Bittersweet")
+    """
+    tags = func.regexp_split_to_array(func.btrim(Experiment.tags, ' \t\r\n'), r'\s*,\s*')
+    return literal(tag.strip()) == any_(tags)
+
+
+def experiment_filter(ids=None, tag=None, status=None, date_from=None, date_to=None):
+    """Subquery of analysis ids for the experiments matching all given filters"""
+    query = select(NlpAnalysis.id).join(Experiment, Experiment.id == NlpAnalysis.experiment_id)
+    if ids:
+        query = query.where(Experiment.id.in_(ids))
+    if tag:
+        query = query.where(has_tag(tag))
+    if status:
+        query = query.where(Experiment.status == status)
+    if date_from:
+        query = query.where(Experiment.date >= date_from)
+    if date_to:
+        query = query.where(Experiment.date <= date_to)
+    return query
+
+
+def export_columns(dataset):
+    _, columns, _ = EXPORT_DATASETS[dataset]
+    return KEY_COLUMNS + columns
+
+
+def export_query(dataset, analysis_ids):
+    """Column-only query for one dataset, grouped per analysis and in time order"""
+    model, columns, order = EXPORT_DATASETS[dataset]
+    return (db.session.query(NlpAnalysis.experiment_id, model.analysis_id,
+                             *[getattr(model, name) for name, _ in columns])
+            .join(NlpAnalysis, NlpAnalysis.id == model.analysis_id)
+            .filter(model.analysis_id.in_(analysis_ids))
+            .order_by(NlpAnalysis.experiment_id, model.analysis_id,
+                      *[getattr(model, name) for name in order]))
+
+
+def _batches(query, columns):
+    """Lists of rows from a server-side cursor, JSON columns serialised"""
+    json_positions = [i for i, (_, kind) in enumerate(columns) if kind == 'json']
+    batch = []
+    for row in query.yield_per(EXPORT_CHUNK):
+        if json_positions:
+            row = list(row)
+            for i in json_positions:
+                if row[i] is not None:
+                    row[i] = json.dumps(row[i], separators=(',', ':'))
+        batch.append(row)
+        if len(batch) == EXPORT_CHUNK:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(query, columns):
+    """CSV text chunks, one per cursor batch, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for batch in _batches(query, columns):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_parquet(query, columns):
+    """
+    Write the query to a Parquet file with polars and return its path.
+    Each cursor batch becomes its own part file, then polars' streaming
+    engine merges them, so no step holds more than a batch in memory.
+    The caller removes the file's directory when done (see parquet_cleanup).
+    """
+    import polars as pl  # heavy, only loaded for Parquet exports
+
+    dtypes = {'int': pl.Int64, 'float': pl.Float64, 'str': pl.Utf8, 'json': pl.Utf8}
+    schema = {name: dtypes[kind] for name, kind in columns}
+
+    workdir = tempfile.mkdtemp(prefix='tastelab-export-')
+    parts = 0
+    for batch in _batches(query, columns):
+        frame = pl.DataFrame(batch, schema=schema, orient='row')
+        frame.write_parquet(os.path.join(workdir, f'part-{parts:05d}.parquet'))
+        parts += 1
+
+    output = os.path.join(workdir, 'export.parquet')
+    if parts:
+        pl.scan_parquet(os.path.join(workdir, 'part-*.parquet')).sink_parquet(output)
+    else:
+        pl.DataFrame(schema=schema).write_parquet(output)
+    return output
+
+
+def parquet_cleanup(path):
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
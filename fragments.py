@@ -0,0 +1,74 @@
+import os
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+
+from flask import get_template_attribute
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+FRAGMENT_TEMPLATE = 'fragments.html'
+
+
+class FragmentCache:
+    """
+    Process-local LRU of rendered per-experiment HTML. Keys carry the
+    experiment's updated_at, so an edit or import in any worker makes every
+    worker miss; invalidate() just frees this process' stale entries early.
+    """
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+            return html
+
+    def set(self, key, html):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, experiment_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == experiment_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+def render_fragment(macro, experiment, *args):
+    """Jinja global: a macro from fragments.html for one experiment, cached"""
+    key = (macro, experiment.id, experiment.updated_at, args)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = Markup(get_template_attribute(FRAGMENT_TEMPLATE, macro)(experiment, *args))
+        fragment_cache.set(key, html)
+    return html
+
+
+def init_fragments(app):
+    """Register fragment() for templates and a persistent Jinja bytecode cache"""
+    app.config.setdefault('FRAGMENT_CACHE_SIZE', 2000)
+    app.config.setdefault('JINJA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'tastelab-jinja'))
+
+    fragment_cache.max_entries = app.config['FRAGMENT_CACHE_SIZE']
+    app.jinja_env.globals['fragment'] = render_fragment
+
+    # Compiled templates survive worker restarts, so cold workers skip compiling
+    cache_dir = app.config['JINJA_CACHE_DIR']
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
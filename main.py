@@ -1,37 +1,68 @@
-from auth import auth
 from flask import Flask, render_template
 from flask_login import LoginManager, current_user
-from flask_apscheduler import APScheduler
-from models import User, db
-from views import views
+from models import db
 from config import Config
-
-# Create Flask Instance
-app = Flask(__name__)
-
-# Add Database
-app.config.from_object(Config)
-
-# Initialize the database with app
-db.init_app(app)
-
-# Initialize Scheduler
-scheduler = APScheduler()
-
-# Import Blueprints
-app.register_blueprint(views, url_prefix="/")
-app.register_blueprint(auth, url_prefix="/")
+from security import load_cached_user
 
 # Initialize LoginManager for user authentication
 login_manager = LoginManager()
 login_manager.login_view = "auth.login"
-login_manager.init_app(app)
 
 
 # Function to load user given its ID
 @login_manager.user_loader
 def load_user(id):
-    return db.session.get(User, int(id))
+    return load_cached_user(int(id))
+
+
+def create_app(config_object=Config, migrations=True):
+    """
+    Application factory. Only what every request needs is set up here; the
+    scheduler (configure_scheduler), the MinIO client (sync.minio_service) and
+    numpy-backed analytics are imported on first use, so web workers boot
+    without them. migrations=False skips Flask-Migrate (and alembic), which
+    only the `flask db` commands need.
+    """
+    from auth import auth
+    from compression import init_compression
+    from database import init_engines
+    from fragments import init_fragments
+    from profiling import init_profiling
+    from views import views
+
+    # Create Flask Instance
+    app = Flask(__name__)
+
+    # Add Database
+    app.config.from_object(config_object)
+
+    # Initialize the database with app
+    db.init_app(app)
+    init_engines(app, db)
+
+    # Schema migrations (flask db upgrade)
+    if migrations:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    # Compress responses and serve fingerprinted, precompressed static files
+    init_compression(app)
+
+    # Opt-in SQL / render profiling per request (SQL_PROFILING=true)
+    init_profiling(app, db)
+
+    # Cached experiment card fragments and persistent Jinja bytecode cache
+    init_fragments(app)
+
+    # Import Blueprints
+    app.register_blueprint(views, url_prefix="/")
+    app.register_blueprint(auth, url_prefix="/")
+
+    login_manager.init_app(app)
+
+    register_commands(app)
+    register_error_handlers(app)
+    return app
 
 
 # Configure scheduled tasks
@@ -39,7 +70,10 @@ def configure_scheduler(app):
     """Configure background tasks"""
     if not app.config.get('SCHEDULER_ENABLED', True):
         return
-    
+
+    from flask_apscheduler import APScheduler
+    scheduler = APScheduler()
+
     @scheduler.task('interval', id='sync_minio', minutes=60, max_instances=1, misfire_grace_time=60)
     def scheduled_minio_sync():
         """Run every 60 minutes to check for new MinIO data"""
@@ -54,32 +88,72 @@ def configure_scheduler(app):
                 app.logger.error(f"Scheduler error: {e}")
                 import traceback
                 app.logger.error(traceback.format_exc())
-    
+
     scheduler.init_app(app)
     scheduler.start()
-    app.logger.info("Background scheduler started - checking MinIO every 5 minutes")
+    app.logger.info("Background scheduler started - checking MinIO every 60 minutes")
+    return scheduler
 
-# Custom Error Pages
-# Invalid URL
-@app.errorhandler(404)
-def page_not_found(e):
-    return render_template("404.html", user=current_user), 404
 
+# CLI maintenance commands
+def register_commands(app):
+    @app.cli.command("rebuild-keyword-index")
+    def rebuild_keyword_index_command():
+        """Backfill the global keyword rollups from existing analyses"""
+        from sync.keyword_index import rebuild_keyword_index
+        print(f"Keyword index rebuilt from {rebuild_keyword_index()} analyses")
+
+    @app.cli.command("backfill-emotion-flow")
+    def backfill_emotion_flow_command():
+        """Compute emotion transition matrices for analyses imported without them"""
+        from sync.data_import import backfill_emotion_transitions
+        print(f"Emotion transitions computed for {backfill_emotion_transitions()} analyses")
 
-# Internal Server Error
-@app.errorhandler(500)
-def internal_server_error(e):
-    return render_template("500.html", user=current_user), 500
+    @app.cli.command("rebuild-emotion-trends")
+    def rebuild_emotion_trends_command():
+        """Recompute the day / week emotion trend rollups from stored segments"""
+        from sync.emotion_trends import rebuild_emotion_trends
+        print(f"Emotion trends rebuilt from {rebuild_emotion_trends()} analyses")
+
+    @app.cli.command("check-query-plans")
+    def check_query_plans_command():
+        """EXPLAIN the main view queries on the current data and fail when they miss their indexes"""
+        from query_plans import check_query_plans
+        failures, not_judged = check_query_plans()
+        for name in not_judged:
+            print(f"SKIPPED   {name}: tables too small to judge, seed more data")
+        for name, problems in failures.items():
+            print(f"FAILED    {name}: {', '.join(problems)}")
+        if failures:
+            raise SystemExit(1)
+        print("All judged view queries use their indexes")
+
+
+# Custom Error Pages
+def register_error_handlers(app):
+    # Invalid URL
+    @app.errorhandler(404)
+    def page_not_found(e):
+        return render_template("404.html", user=current_user), 404
+
+    # Internal Server Error
+    @app.errorhandler(500)
+    def internal_server_error(e):
+        return render_template("500.html", user=current_user), 500
 
 
 # Run the application
 if __name__ == "__main__":
-    # Create database tables
+    from flask_migrate import upgrade
+
+    app = create_app()
+
+    # Apply pending schema migrations
     with app.app_context():
-        db.create_all()
-        print("Database tables created!")
-    
+        upgrade()
+        print("Database schema up to date!")
+
     # Start background scheduler
     configure_scheduler(app)
-    
-    app.run(debug=True)
\ No newline at end of file
+
+    app.run(debug=True)
@@ -0,0 +1,166 @@
+"""baseline schema as created by db.create_all()
+
+Databases created before migrations were introduced already have these
+tables: mark them with `flask db stamp 0001_baseline`, then `flask db upgrade`.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _analysis_fk():
+    return sa.Column('analysis_id', sa.Integer(), sa.ForeignKey('nlp_analysis.id'), nullable=False)
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(length=150), unique=True),
+        sa.Column('password', sa.String(length=150)),
+        sa.Column('first_name', sa.String(length=150)),
+        sa.Column('last_name', sa.String(length=150)),
+    )
+    op.create_table(
+        'experiments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(length=150), unique=True),
+        sa.Column('description', sa.Text()),
+        sa.Column('date', sa.DateTime()),
+        sa.Column('tags', sa.String(length=200)),
+        sa.Column('participant_count', sa.Integer()),
+        sa.Column('duration', sa.Integer()),
+        sa.Column('avg_score', sa.Float()),
+        sa.Column('status', sa.String(length=150)),
+    )
+    op.create_table(
+        'nlp_analysis',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('experiment_id', sa.Integer(), sa.ForeignKey('experiments.id'), nullable=True),
+        sa.Column('source_filename', sa.String(length=255)),
+        sa.Column('generated_at', sa.DateTime()),
+        sa.Column('analyzed_at', sa.DateTime()),
+        sa.Column('model_used', sa.String(length=100)),
+        sa.Column('total_segments', sa.Integer()),
+        sa.Column('reading_time_minutes', sa.Float()),
+        sa.Column('word_count', sa.Integer()),
+        sa.Column('unique_words_count', sa.Integer()),
+        sa.Column('lexical_diversity', sa.Float()),
+        sa.Column('dominant_emotion', sa.String(length=50)),
+    )
+    op.create_table(
+        'emotion_summary',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('emotion_percentages', postgresql.JSONB()),
+        sa.Column('emotion_counts', postgresql.JSONB()),
+        sa.Column('primary_emotion_counts', postgresql.JSONB()),
+        sa.Column('emotion_transitions', postgresql.JSONB()),
+        sa.Column('stability_score', sa.Float()),
+    )
+    op.create_table(
+        'timeline_segments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('segment_index', sa.Integer()),
+        sa.Column('start_time', sa.Float()),
+        sa.Column('end_time', sa.Float()),
+        sa.Column('duration', sa.Float()),
+        sa.Column('text_content', sa.Text()),
+        sa.Column('primary_emotion', sa.String(length=50)),
+        sa.Column('sentiment_label', sa.String(length=50)),
+        sa.Column('sentiment_score', sa.Float()),
+        sa.Column('confidence_score', sa.Float()),
+        sa.Column('emotion_vector', postgresql.JSONB()),
+    )
+    op.create_table(
+        'chart_bins',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('bin_index', sa.Integer()),
+        sa.Column('start_time', sa.Float()),
+        sa.Column('end_time', sa.Float()),
+        sa.Column('formatted_start', sa.String(length=20)),
+        sa.Column('formatted_end', sa.String(length=20)),
+        sa.Column('dominant_emotion', sa.String(length=50)),
+        sa.Column('emotion_counts', postgresql.JSONB()),
+        sa.Column('emotion_percentages', postgresql.JSONB()),
+    )
+    op.create_table(
+        'transcript_summaries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('content', sa.Text()),
+        sa.Column('length_profile', sa.String(length=50)),
+        sa.Column('num_segments', sa.Integer()),
+    )
+    op.create_table(
+        'keywords',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('text', sa.String(length=100)),
+        sa.Column('rank', sa.Integer()),
+        sa.Column('value', sa.Integer()),
+        sa.Column('tf_idf_score', sa.Float()),
+        sa.Column('relevance_score', sa.Float()),
+    )
+    op.create_table(
+        'topic_sentiments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('topic_name', sa.String(length=100)),
+        sa.Column('total_segments', sa.Integer()),
+        sa.Column('dominant_emotion', sa.String(length=50)),
+        sa.Column('average_confidence', sa.Float()),
+        sa.Column('emotion_diversity', sa.Float()),
+        sa.Column('time_span_seconds', sa.Float()),
+        sa.Column('sample_segments', postgresql.JSONB()),
+    )
+    op.create_table(
+        'detected_questions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('question_text', sa.Text()),
+        sa.Column('pattern_matched', sa.String(length=255)),
+        sa.Column('position_index', sa.Integer()),
+        sa.Column('confidence', sa.Float()),
+    )
+    op.create_table(
+        'detected_actions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('action_text', sa.Text()),
+        sa.Column('pattern_matched', sa.String(length=255)),
+        sa.Column('position_index', sa.Integer()),
+        sa.Column('confidence', sa.Float()),
+    )
+    op.create_table(
+        'text_insights',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        _analysis_fk(),
+        sa.Column('top_bigrams', postgresql.JSONB()),
+        sa.Column('top_trigrams', postgresql.JSONB()),
+        sa.Column('important_sentences', postgresql.JSONB()),
+        sa.Column('avg_sentence_length', sa.Float()),
+        sa.Column('avg_word_length', sa.Float()),
+    )
+
+
+def downgrade():
+    for table in ('text_insights', 'detected_actions', 'detected_questions',
+                  'topic_sentiments', 'keywords', 'transcript_summaries',
+                  'chart_bins', 'timeline_segments', 'emotion_summary',
+                  'nlp_analysis', 'experiments', 'users'):
+        op.drop_table(table)
@@ -0,0 +1,95 @@
+"""production index set, chart pyramid, full-text search and keyword index
+
+Adds an index on every analysis_id foreign key and on the experiment
+columns the views filter and sort on, plus the schema introduced for
+chart bin pyramids, transcript search and the global keyword rollups.
+Indexes use IF NOT EXISTS so databases where some were created by
+db.create_all() upgrade cleanly.
+
+Revision ID: 0002_performance_schema
+Revises: 0001_baseline
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_performance_schema'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_experiments_date', 'experiments', ['date']),
+    ('ix_experiments_status', 'experiments', ['status']),
+    ('ix_nlp_analysis_experiment_id', 'nlp_analysis', ['experiment_id']),
+    ('ix_nlp_analysis_source_filename', 'nlp_analysis', ['source_filename']),
+    ('ix_emotion_summary_analysis_id', 'emotion_summary', ['analysis_id']),
+    ('ix_timeline_segments_analysis_start', 'timeline_segments', ['analysis_id', 'start_time']),
+    ('ix_chart_bins_analysis_resolution', 'chart_bins', ['analysis_id', 'resolution', 'bin_index']),
+    ('ix_transcript_summaries_analysis_id', 'transcript_summaries', ['analysis_id']),
+    ('ix_keywords_analysis_rank', 'keywords', ['analysis_id', 'rank']),
+    ('ix_topic_sentiments_analysis_id', 'topic_sentiments', ['analysis_id']),
+    ('ix_detected_questions_analysis_id', 'detected_questions', ['analysis_id']),
+    ('ix_detected_actions_analysis_id', 'detected_actions', ['analysis_id']),
+    ('ix_text_insights_analysis_id', 'text_insights', ['analysis_id']),
+]
+
+
+def upgrade():
+    # Chart bin level-of-detail pyramid
+    op.add_column('chart_bins', sa.Column('mean_confidence', sa.Float()))
+    op.add_column('chart_bins', sa.Column('resolution', sa.Float()))
+
+    # Transcript full-text search
+    op.add_column('timeline_segments', sa.Column(
+        'text_search',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('english', coalesce(text_content, ''))", persisted=True)
+    ))
+    op.create_index('ix_timeline_segments_text_search', 'timeline_segments', ['text_search'],
+                    postgresql_using='gin', if_not_exists=True)
+
+    # Global keyword index
+    op.create_table(
+        'keyword_rollups',
+        sa.Column('scope', sa.String(length=10), primary_key=True),
+        sa.Column('scope_key', sa.String(length=200), primary_key=True),
+        sa.Column('term', sa.String(length=100), primary_key=True),
+        sa.Column('document_frequency', sa.Integer()),
+        sa.Column('total_count', sa.Integer()),
+        sa.Column('relevance_sum', sa.Float()),
+    )
+    op.create_table(
+        'keyword_postings',
+        sa.Column('term', sa.String(length=100), primary_key=True),
+        sa.Column('analysis_id', sa.Integer(),
+                  sa.ForeignKey('nlp_analysis.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('experiment_id', sa.Integer(), sa.ForeignKey('experiments.id')),
+        sa.Column('value', sa.Integer()),
+        sa.Column('relevance_score', sa.Float()),
+    )
+    op.create_index('ix_keyword_postings_experiment_id', 'keyword_postings', ['experiment_id'])
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+
+    op.drop_index('ix_keyword_postings_experiment_id', table_name='keyword_postings')
+    op.drop_table('keyword_postings')
+    op.drop_table('keyword_rollups')
+
+    op.drop_index('ix_timeline_segments_text_search', table_name='timeline_segments', if_exists=True)
+    op.drop_column('timeline_segments', 'text_search')
+
+    op.drop_column('chart_bins', 'resolution')
+    op.drop_column('chart_bins', 'mean_confidence')
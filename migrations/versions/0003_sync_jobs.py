@@ -0,0 +1,42 @@
+"""background sync jobs
+
+Revision ID: 0003_sync_jobs
+Revises: 0002_performance_schema
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_sync_jobs'
+down_revision = '0002_performance_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sync_jobs',
+        sa.Column('id', sa.String(length=32), primary_key=True),
+        sa.Column('status', sa.String(length=20)),
+        sa.Column('max_imports', sa.Integer()),
+        sa.Column('total_files', sa.Integer()),
+        sa.Column('checked', sa.Integer()),
+        sa.Column('imported', sa.Integer()),
+        sa.Column('skipped', sa.Integer()),
+        sa.Column('failed', sa.Integer()),
+        sa.Column('current_file', sa.String(length=255)),
+        sa.Column('error', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_sync_jobs_status', 'sync_jobs', ['status'])
+
+
+def downgrade():
+    op.drop_index('ix_sync_jobs_status', table_name='sync_jobs')
+    op.drop_table('sync_jobs')
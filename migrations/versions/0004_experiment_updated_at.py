@@ -0,0 +1,25 @@
+"""experiments.updated_at for fragment cache keys
+
+Revision ID: 0004_experiment_updated_at
+Revises: 0003_sync_jobs
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_experiment_updated_at'
+down_revision = '0003_sync_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('experiments', sa.Column('updated_at', sa.DateTime()))
+    op.execute("UPDATE experiments SET updated_at = now() AT TIME ZONE 'utc'")
+
+
+def downgrade():
+    op.drop_column('experiments', 'updated_at')
@@ -0,0 +1,37 @@
+"""emotion trend rollups
+
+Revision ID: 0005_emotion_trends
+Revises: 0004_experiment_updated_at
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_emotion_trends'
+down_revision = '0004_experiment_updated_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'emotion_trends',
+        sa.Column('scope', sa.String(length=10), primary_key=True),
+        sa.Column('scope_key', sa.String(length=200), primary_key=True),
+        sa.Column('granularity', sa.String(length=10), primary_key=True),
+        sa.Column('bucket_start', sa.Date(), primary_key=True),
+        sa.Column('emotion', sa.String(length=50), primary_key=True),
+        sa.Column('experiment_count', sa.Integer()),
+        sa.Column('segment_count', sa.Integer()),
+        sa.Column('confidence_sum', sa.Float()),
+        sa.Column('sentiment_sum', sa.Float()),
+        sa.Column('positive_segments', sa.Integer()),
+        sa.Column('negative_segments', sa.Integer()),
+    )
+
+
+def downgrade():
+    op.drop_table('emotion_trends')
@@ -1,10 +1,13 @@
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Float, cast, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, joinedload
+from database import RoutingSession
 from db_names import Tables, Columns
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 class User(db.Model, UserMixin):
@@ -26,12 +29,14 @@ class Experiment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), unique=True)
     description = db.Column(db.Text)
-    date = db.Column(db.DateTime, default=datetime.utcnow)
+    date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     tags = db.Column(db.String(200))
     participant_count = db.Column(db.Integer, default=0)
     duration = db.Column(db.Integer)
     avg_score = db.Column(db.Float, default=0.0)
-    status = db.Column(db.String(150), default="Completed")
+    status = db.Column(db.String(150), default="Completed", index=True)
+    # Bumped on edit and on analysis import; part of the rendered-fragment cache key
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationship to analysis
     analysis = db.relationship(
@@ -52,7 +57,11 @@ class Experiment(db.Model):
         if duration_value is None:
             duration_value = self.calculated_duration
         
-        # If still no duration, return N/A
+        return self.format_minutes(duration_value)
+
+    @staticmethod
+    def format_minutes(duration_value):
+        # No duration available
         if duration_value is None:
             return "N/A"
             
@@ -67,10 +76,11 @@ class Experiment(db.Model):
     
     @property
     def calculated_duration(self):
-        if self.analysis and self.analysis.timeline_segments.count() > 0:
-            segments = self.analysis.timeline_segments.all()
-            if segments:
-                total_duration = max(seg.end_time for seg in segments)
+        if self.analysis:
+            total_duration = (db.session.query(func.max(TimelineSegment.end_time))
+                              .filter(TimelineSegment.analysis_id == self.analysis.id)
+                              .scalar())
+            if total_duration is not None:
                 return int(total_duration / 60)
         return None
 
@@ -83,10 +93,11 @@ class NlpAnalysis(db.Model):
         db.Integer,
         db.ForeignKey(f"{Tables.EXPERIMENTS}.id"),
         nullable=True,
+        index=True,
     )
 
     # Metadata from source files
-    source_filename = db.Column(db.String(255))
+    source_filename = db.Column(db.String(255), index=True)
     generated_at = db.Column(db.DateTime, default=datetime.utcnow)
     analyzed_at = db.Column(db.DateTime)
     model_used = db.Column(db.String(100))
@@ -171,6 +182,7 @@ class EmotionSummary(db.Model):
         db.Integer,
         db.ForeignKey(f"{Tables.NLP_ANALYSIS}.id"),
         nullable=False,
+        index=True,
     )
 
     emotion_percentages = db.Column(JSONB)
@@ -186,8 +198,18 @@ class TimelineSegment(db.Model):
     """
     Sentence-by-sentence analysis.
     Source: sentiment.json -> detailed_analyses
+
+    The transcript text, its search vector and the emotion vector are
+    deferred: loading a segment fetches only the small numeric/label columns.
+    Use undefer_group('text') / undefer_group('vectors') when they're needed,
+    or better, query just the columns (see views._timeline_query).
     """
     __tablename__ = Tables.TIMELINE_SEGMENTS
+    __table_args__ = (
+        # Time-range reads and ordered scans within one analysis
+        db.Index("ix_timeline_segments_analysis_start", "analysis_id", "start_time"),
+        db.Index("ix_timeline_segments_text_search", "text_search", postgresql_using="gin"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     analysis_id = db.Column(
@@ -201,7 +223,12 @@ class TimelineSegment(db.Model):
     end_time = db.Column(db.Float)
     duration = db.Column(db.Float)
 
-    text_content = db.Column(db.Text)
+    text_content = deferred(db.Column(db.Text), group='text')
+    # Full-text search vector, generated by Postgres whenever text_content is written
+    text_search = deferred(db.Column(
+        TSVECTOR,
+        db.Computed("to_tsvector('english', coalesce(text_content, ''))", persisted=True)
+    ), group='text')
 
     # Sentiment specific
     primary_emotion = db.Column(db.String(50))
@@ -210,15 +237,19 @@ class TimelineSegment(db.Model):
     confidence_score = db.Column(db.Float)
 
     # Stores the full vector object: {"neutral": 0.75, "happy": 0.23, "sad": 0.01}
-    emotion_vector = db.Column(JSONB)
+    emotion_vector = deferred(db.Column(JSONB), group='vectors')
 
 
 class ChartBin(db.Model):
     """
     Pre-aggregated time bins (e.g., every 60 seconds) for faster UI charting.
-    Source: chart_data.json -> timeline_bins
+    Source: chart_data.json -> timeline_bins, plus a level-of-detail
+    pyramid computed from the timeline segments at import
     """
     __tablename__ = Tables.CHART_BINS
+    __table_args__ = (
+        db.Index("ix_chart_bins_analysis_resolution", "analysis_id", "resolution", "bin_index"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     analysis_id = db.Column(
@@ -237,6 +268,11 @@ class ChartBin(db.Model):
     # Aggregated counts for this specific bin
     emotion_counts = db.Column(JSONB)
     emotion_percentages = db.Column(JSONB)
+    mean_confidence = db.Column(db.Float)
+
+    # Bin width in seconds for the import-time level-of-detail pyramid
+    # (NULL for the upstream bins from chart_data.json)
+    resolution = db.Column(db.Float)
 
 
 class TranscriptSummary(db.Model):
@@ -251,6 +287,7 @@ class TranscriptSummary(db.Model):
         db.Integer,
         db.ForeignKey(f"{Tables.NLP_ANALYSIS}.id"),
         nullable=False,
+        index=True,
     )
 
     content = db.Column(db.Text)  # "final_summary_preview"
@@ -264,6 +301,9 @@ class Keyword(db.Model):
     Source: keyword_cloud.json
     """
     __tablename__ = Tables.KEYWORDS
+    __table_args__ = (
+        db.Index("ix_keywords_analysis_rank", "analysis_id", "rank"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     analysis_id = db.Column(
@@ -279,6 +319,70 @@ class Keyword(db.Model):
     relevance_score = db.Column(db.Float)
 
 
+class KeywordRollup(db.Model):
+    """
+    Cross-analysis keyword statistics, maintained incrementally at import.
+    One row per (scope, scope_key, term): scope "all" (scope_key ""),
+    "tag" (scope_key = tag) or "day" (scope_key = YYYY-MM-DD).
+    """
+    __tablename__ = Tables.KEYWORD_ROLLUPS
+
+    scope = db.Column(db.String(10), primary_key=True)
+    scope_key = db.Column(db.String(200), primary_key=True)
+    term = db.Column(db.String(100), primary_key=True)
+
+    document_frequency = db.Column(db.Integer, default=0)  # analyses containing the term
+    total_count = db.Column(db.Integer, default=0)
+    relevance_sum = db.Column(db.Float, default=0.0)
+
+    @property
+    def mean_relevance(self):
+        return self.relevance_sum / self.document_frequency if self.document_frequency else 0.0
+
+
+class KeywordPosting(db.Model):
+    """
+    Which experiments contain a normalised keyword term.
+    """
+    __tablename__ = Tables.KEYWORD_POSTINGS
+
+    term = db.Column(db.String(100), primary_key=True)
+    analysis_id = db.Column(
+        db.Integer,
+        db.ForeignKey(f"{Tables.NLP_ANALYSIS}.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    experiment_id = db.Column(db.Integer, db.ForeignKey(f"{Tables.EXPERIMENTS}.id"), index=True)
+
+    value = db.Column(db.Integer)
+    relevance_score = db.Column(db.Float)
+
+
+class EmotionTrend(db.Model):
+    """
+    Segment-level emotion and sentiment sums per time bucket, maintained
+    incrementally at import. One row per (scope, scope_key, granularity,
+    bucket_start, emotion): scope "all" (scope_key "") or "tag", granularity
+    "day" or "week" (bucket_start = the Monday). Every column is a sum, so
+    rows merge with plain additions; each analysis adds experiment_count=1
+    only to the row of its dominant emotion.
+    """
+    __tablename__ = Tables.EMOTION_TRENDS
+
+    scope = db.Column(db.String(10), primary_key=True)
+    scope_key = db.Column(db.String(200), primary_key=True)
+    granularity = db.Column(db.String(10), primary_key=True)
+    bucket_start = db.Column(db.Date, primary_key=True)
+    emotion = db.Column(db.String(50), primary_key=True)
+
+    experiment_count = db.Column(db.Integer, default=0)
+    segment_count = db.Column(db.Integer, default=0)
+    confidence_sum = db.Column(db.Float, default=0.0)
+    sentiment_sum = db.Column(db.Float, default=0.0)
+    positive_segments = db.Column(db.Integer, default=0)
+    negative_segments = db.Column(db.Integer, default=0)
+
+
 class TopicSentiment(db.Model):
     """
     Sentiment analysis grouped by topic (e.g., "Technology", "Meeting").
@@ -291,6 +395,7 @@ class TopicSentiment(db.Model):
         db.Integer,
         db.ForeignKey(f"{Tables.NLP_ANALYSIS}.id"),
         nullable=False,
+        index=True,
     )
 
     topic_name = db.Column(db.String(100))
@@ -316,6 +421,7 @@ class DetectedQuestion(db.Model):
         db.Integer,
         db.ForeignKey(f"{Tables.NLP_ANALYSIS}.id"),
         nullable=False,
+        index=True,
     )
 
     question_text = db.Column(db.Text)
@@ -336,6 +442,7 @@ class DetectedAction(db.Model):
         db.Integer,
         db.ForeignKey(f"{Tables.NLP_ANALYSIS}.id"),
         nullable=False,
+        index=True,
     )
 
     action_text = db.Column(db.Text)
@@ -348,6 +455,8 @@ class TextInsight(db.Model):
     """
     Linguistic insights like bigrams and important sentences.
     Source: insights.json
+
+    important_sentences is deferred (group 'sentences'); it's only read when accessed.
     """
     __tablename__ = Tables.TEXT_INSIGHTS
 
@@ -356,12 +465,115 @@ class TextInsight(db.Model):
         db.Integer,
         db.ForeignKey(f"{Tables.NLP_ANALYSIS}.id"),
         nullable=False,
+        index=True,
     )
 
     # Storing lists of strings/arrays as JSONB
     top_bigrams = db.Column(JSONB)
     top_trigrams = db.Column(JSONB)
-    important_sentences = db.Column(JSONB)
+    important_sentences = deferred(db.Column(JSONB), group='sentences')
 
     avg_sentence_length = db.Column(db.Float)
-    avg_word_length = db.Column(db.Float)
\ No newline at end of file
+    avg_word_length = db.Column(db.Float)
+
+
+
+class SyncJob(db.Model):
+    """
+    A manually triggered MinIO sync running in the background. Progress lives
+    in the database so every web worker can report it.
+    """
+    __tablename__ = Tables.SYNC_JOBS
+
+    ACTIVE = ('queued', 'running')
+
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), default='queued', index=True)
+    max_imports = db.Column(db.Integer)
+
+    total_files = db.Column(db.Integer, default=0)
+    checked = db.Column(db.Integer, default=0)
+    imported = db.Column(db.Integer, default=0)
+    skipped = db.Column(db.Integer, default=0)
+    failed = db.Column(db.Integer, default=0)
+    current_file = db.Column(db.String(255))
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def eta_seconds(self):
+        """Remaining time extrapolated from the files checked so far"""
+        if self.status != 'running' or not self.checked or not self.total_files or not self.started_at:
+            return None
+        elapsed = ((self.updated_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return round(elapsed / self.checked * (self.total_files - self.checked), 1)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total_files': self.total_files,
+            'checked': self.checked,
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'current_file': self.current_file,
+            'eta_seconds': self.eta_seconds,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+# Eager-loading profiles per view. Scalar relationships are joined in the
+# main query; dynamic collections are never walked from templates, views
+# fetch previews explicitly and counts via analysis_child_stats().
+LOADER_PROFILES = {
+    # Cards, selectors and activity lists that only check "exp.analysis"
+    "list": (joinedload(Experiment.analysis),),
+    # Detail pages showing analysis metadata and the emotion summary
+    "detail": (
+        joinedload(Experiment.analysis).joinedload(NlpAnalysis.emotion_summary),
+    ),
+}
+
+
+def loader_profile(name):
+    """Return the loader options for a named view profile"""
+    return LOADER_PROFILES[name]
+
+
+def analysis_child_stats(analysis_ids):
+    """
+    Per-analysis segment, question, action and keyword counts plus the last
+    segment end time, for any number of analyses in a single grouped round trip.
+    """
+    stats = {aid: {"timeline_points": 0, "questions_detected": 0,
+                   "actions_detected": 0, "keywords": 0, "max_end_time": None}
+             for aid in analysis_ids}
+    if not analysis_ids:
+        return stats
+
+    aggregates = (
+        ("timeline_points", TimelineSegment, func.count(TimelineSegment.id)),
+        ("max_end_time", TimelineSegment, func.max(TimelineSegment.end_time)),
+        ("questions_detected", DetectedQuestion, func.count(DetectedQuestion.id)),
+        ("actions_detected", DetectedAction, func.count(DetectedAction.id)),
+        ("keywords", Keyword, func.count(Keyword.id)),
+    )
+    parts = [
+        select(model.analysis_id, literal(kind).label("kind"), cast(aggregate, Float).label("value"))
+        .where(model.analysis_id.in_(analysis_ids))
+        .group_by(model.analysis_id)
+        for kind, model, aggregate in aggregates
+    ]
+
+    for analysis_id, kind, value in db.session.execute(union_all(*parts)):
+        if value is None:
+            continue
+        stats[analysis_id][kind] = value if kind == "max_end_time" else int(value)
+    return stats
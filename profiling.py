@@ -0,0 +1,184 @@
+import cProfile
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import before_render_template, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:  # pyinstrument is optional, cProfile is always available
+    PyinstrumentProfiler = None
+
+# Key in the WSGI environ; the environ is shared with copied request contexts,
+# so queries run by query_fanout worker threads are counted too
+ENVIRON_KEY = 'tastelab.profile'
+
+SLOWEST_STATEMENTS = 5
+
+_PARAM = re.compile(r"%\(\w+\)s|\?|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """Statement shape with literals and bind parameters replaced by ?"""
+    shape = _PARAM.sub('?', statement)
+    shape = _PARAM_LIST.sub('?, ...', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class RequestProfile:
+    """SQL statements, render time and an optional profiler for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = []          # (statement, seconds, during_render)
+        self.render_seconds = 0.0
+        self.render_started = None
+        self.profiler = None
+
+    def record(self, statement, seconds):
+        self.statements.append((statement, seconds, self.render_started is not None))
+
+    def summary(self, threshold):
+        total = time.perf_counter() - self.started
+        sql_seconds = sum(seconds for _, seconds, _ in self.statements)
+        counts = Counter(fingerprint(statement) for statement, _, _ in self.statements)
+        return {
+            'total_ms': round(total * 1000, 1),
+            'view_ms': round((total - self.render_seconds) * 1000, 1),
+            'render_ms': round(self.render_seconds * 1000, 1),
+            'queries': len(self.statements),
+            'render_queries': sum(1 for *_, during_render in self.statements if during_render),
+            'sql_ms': round(sql_seconds * 1000, 1),
+            'slowest': sorted(((round(seconds * 1000, 2), statement)
+                               for statement, seconds, _ in self.statements), reverse=True)[:SLOWEST_STATEMENTS],
+            'repeated': [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+        }
+
+
+def _current_profile():
+    if not has_request_context():
+        return None
+    return request.environ.get(ENVIRON_KEY)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Start time lives on the statement's execution context rather than the
+    # pooled connection, so a statement that raises leaves nothing behind
+    if context is not None and _current_profile() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    started = getattr(context, '_profile_started', None)
+    if profile is not None and started is not None:
+        profile.record(statement, time.perf_counter() - started)
+
+
+def _start_render(sender, template, context, **extra):
+    profile = _current_profile()
+    if profile is not None:
+        profile.render_started = time.perf_counter()
+
+
+def _end_render(sender, template, context, **extra):
+    profile = _current_profile()
+    if profile is not None and profile.render_started is not None:
+        profile.render_seconds += time.perf_counter() - profile.render_started
+        profile.render_started = None
+
+
+def _dump_profile(app, profile):
+    directory = app.config['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    name = (f"{datetime.now():%Y%m%d-%H%M%S}-{request.method}-"
+            f"{request.path.strip('/').replace('/', '_') or 'home'}")
+    if PyinstrumentProfiler is not None and isinstance(profile.profiler, PyinstrumentProfiler):
+        path = os.path.join(directory, name + '.html')
+        with open(path, 'w') as f:
+            f.write(profile.profiler.output_html())
+    else:
+        path = os.path.join(directory, name + '.prof')
+        profile.profiler.dump_stats(path)
+    return path
+
+
+def init_profiling(app, db):
+    """
+    Opt-in per-request instrumentation (SQL_PROFILING=true): query count, SQL
+    time, slowest statements, repeated statement shapes (likely N+1) and
+    template render time, reported in the X-Query-Profile and Server-Timing
+    headers and logged for slow requests. With PROFILE_DIR set, slow requests
+    also leave a cProfile (or pyinstrument) dump there.
+    """
+    app.config.setdefault('SQL_PROFILING', False)
+    app.config.setdefault('SLOW_REQUEST_MS', 500)
+    app.config.setdefault('N_PLUS_ONE_THRESHOLD', 5)
+    app.config.setdefault('PROFILE_DIR', None)
+    app.config.setdefault('PROFILER', 'cprofile')
+    if not app.config['SQL_PROFILING']:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    before_render_template.connect(_start_render, app)
+    template_rendered.connect(_end_render, app)
+
+    @app.before_request
+    def start_profile():
+        if request.endpoint == 'static':
+            return
+        profile = RequestProfile()
+        if app.config['PROFILE_DIR']:
+            if app.config['PROFILER'] == 'pyinstrument' and PyinstrumentProfiler is not None:
+                profile.profiler = PyinstrumentProfiler()
+                profile.profiler.start()
+            else:
+                profile.profiler = cProfile.Profile()
+                profile.profiler.enable()
+        request.environ[ENVIRON_KEY] = profile
+
+    @app.after_request
+    def report_profile(response):
+        profile = request.environ.pop(ENVIRON_KEY, None)
+        if profile is None:
+            return response
+        if isinstance(profile.profiler, cProfile.Profile):
+            profile.profiler.disable()
+        elif profile.profiler is not None:
+            profile.profiler.stop()
+
+        summary = profile.summary(app.config['N_PLUS_ONE_THRESHOLD'])
+        response.headers['X-Query-Profile'] = (
+            f"queries={summary['queries']}; sql_ms={summary['sql_ms']}; "
+            f"view_ms={summary['view_ms']}; render_ms={summary['render_ms']}; "
+            f"render_queries={summary['render_queries']}; repeated={len(summary['repeated'])}"
+        )
+        response.headers['Server-Timing'] = (
+            f"sql;dur={summary['sql_ms']};desc=\"{summary['queries']} queries\", "
+            f"view;dur={summary['view_ms']}, render;dur={summary['render_ms']}"
+        )
+
+        slow = summary['total_ms'] >= app.config['SLOW_REQUEST_MS']
+        if slow or summary['repeated']:
+            lines = [f"{'Slow request' if slow else 'Repeated queries in'} {request.method} "
+                     f"{request.full_path.rstrip('?')}: {summary['total_ms']}ms total, "
+                     f"{summary['queries']} queries in {summary['sql_ms']}ms, "
+                     f"render {summary['render_ms']}ms ({summary['render_queries']} queries)"]
+            lines += [f"  slow  {ms}ms  {_WHITESPACE.sub(' ', statement)[:200]}"
+                      for ms, statement in summary['slowest']]
+            lines += [f"  N+1?  x{count}  {shape[:200]}" for shape, count in summary['repeated']]
+            if slow and profile.profiler is not None:
+                lines.append(f"  profile written to {_dump_profile(app, profile)}")
+            app.logger.warning('\n'.join(lines))
+
+        return response
@@ -0,0 +1,64 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flask import copy_current_request_context, current_app, g, has_request_context
+
+_executors = {}
+
+
+def _executor(app):
+    """One shared thread pool per app, sized by QUERY_FANOUT_WORKERS (0 = sequential)"""
+    workers = app.config.get('QUERY_FANOUT_WORKERS', 0)
+    if workers <= 0:
+        return None
+    if app not in _executors:
+        _executors[app] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='query-fanout')
+    return _executors[app]
+
+
+def _in_own_context(query):
+    """
+    Wrap a query callable so it runs in a fresh app context, which gives it its
+    own db.session and therefore its own pooled connection. Inside a request the
+    request context is copied so read-replica routing still applies.
+    """
+    if has_request_context():
+        use_primary = g.get('db_use_primary', False)
+
+        @copy_current_request_context
+        def run():
+            g.db_use_primary = use_primary
+            return query()
+        return run
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            return query()
+    return run
+
+
+def start_queries(**queries):
+    """
+    Start independent zero-argument query callables concurrently and return
+    {name: Future} straight away, so the caller can do other work meanwhile.
+
+    Each callable must return fully loaded plain values (scalars, tuples, Row
+    objects): its session is closed when it finishes, so ORM instances come
+    back detached.
+    """
+    executor = _executor(current_app)
+    pending = {}
+    for name, query in queries.items():
+        if executor is not None:
+            pending[name] = executor.submit(_in_own_context(query))
+        else:
+            future = Future()
+            future.set_result(query())
+            pending[name] = future
+    return pending
+
+
+def gather(pending):
+    """Wait for futures from start_queries; re-raises the first failure"""
+    return {name: future.result() for name, future in pending.items()}
@@ -0,0 +1,144 @@
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql
+from models import (
+    db, ChartBin, DetectedAction, DetectedQuestion, EmotionSummary, Experiment,
+    Keyword, KeywordPosting, NlpAnalysis, TimelineSegment
+)
+from db_names import Tables
+
+# Below this many pages a sequential scan is cheaper than any index, so
+# plans on smaller tables are not judged
+MIN_PAGES = 100
+
+# Tables that grow with the number of sessions / segments; a sequential scan
+# on any of these in a view query is a regression
+LARGE_TABLES = {
+    Tables.EXPERIMENTS, Tables.NLP_ANALYSIS, Tables.EMOTION_SUMMARY,
+    Tables.TIMELINE_SEGMENTS, Tables.CHART_BINS, Tables.KEYWORDS,
+    Tables.TOPIC_SENTIMENTS, Tables.DETECTED_QUESTIONS, Tables.DETECTED_ACTIONS,
+    Tables.TEXT_INSIGHTS, Tables.TRANSCRIPT_SUMMARIES, Tables.KEYWORD_POSTINGS,
+}
+
+# Table and index each view query should be served by on realistic data
+EXPECTED_INDEXES = {
+    'home: recent experiments': (Tables.EXPERIMENTS, 'ix_experiments_date'),
+    'experiments: archived': (Tables.EXPERIMENTS, 'ix_experiments_status'),
+    'analysis by experiment': (Tables.NLP_ANALYSIS, 'ix_nlp_analysis_experiment_id'),
+    'sync: analysis by source file': (Tables.NLP_ANALYSIS, 'ix_nlp_analysis_source_filename'),
+    'emotion summary': (Tables.EMOTION_SUMMARY, 'ix_emotion_summary_analysis_id'),
+    'timeline (ordered)': (Tables.TIMELINE_SEGMENTS, 'ix_timeline_segments_analysis_start'),
+    'timeline (range)': (Tables.TIMELINE_SEGMENTS, 'ix_timeline_segments_analysis_start'),
+    'keywords (top 20)': (Tables.KEYWORDS, 'ix_keywords_analysis_rank'),
+    'questions preview': (Tables.DETECTED_QUESTIONS, 'ix_detected_questions_analysis_id'),
+    'actions preview': (Tables.DETECTED_ACTIONS, 'ix_detected_actions_analysis_id'),
+    'chart pyramid levels': (Tables.CHART_BINS, 'ix_chart_bins_analysis_resolution'),
+    'transcript search': (Tables.TIMELINE_SEGMENTS, 'ix_timeline_segments_text_search'),
+    'keyword postings': (Tables.KEYWORD_POSTINGS, 'keyword_postings_pkey'),
+}
+
+
+def view_queries(analysis_id=1, experiment_id=1):
+    """The main statements issued by views.py and the sync job, by name"""
+    from views import _timeline_query
+
+    return {
+        'home: recent experiments': Experiment.query.order_by(Experiment.date.desc()).limit(5),
+        'experiments: archived': (Experiment.query.filter_by(status="Archived")
+                                  .order_by(Experiment.date.desc())),
+        'analysis by experiment': NlpAnalysis.query.filter_by(experiment_id=experiment_id),
+        'sync: analysis by source file': NlpAnalysis.query.filter_by(source_filename='session'),
+        'emotion summary': EmotionSummary.query.filter_by(analysis_id=analysis_id),
+        'timeline (ordered)': _timeline_query(analysis_id, with_text=True),
+        'timeline (range)': _timeline_query(analysis_id, start=30.0, end=60.0),
+        'keywords (top 20)': (Keyword.query.filter_by(analysis_id=analysis_id)
+                              .order_by(Keyword.rank).limit(20)),
+        'questions preview': DetectedQuestion.query.filter_by(analysis_id=analysis_id).limit(5),
+        'actions preview': DetectedAction.query.filter_by(analysis_id=analysis_id).limit(5),
+        'chart pyramid levels': (db.session.query(ChartBin.resolution, func.count(ChartBin.id))
+                                 .filter(ChartBin.analysis_id == analysis_id,
+                                         ChartBin.resolution.isnot(None))
+                                 .group_by(ChartBin.resolution)),
+        # A selective term, as real searches are; the seeded vocabulary matches everywhere
+        'transcript search': TimelineSegment.query.filter(
+            TimelineSegment.text_search.op('@@')(func.websearch_to_tsquery('english', 'metallic'))
+        ),
+        'keyword postings': KeywordPosting.query.filter_by(term='salty'),
+    }
+
+
+def _scans(plan, found=None):
+    """Collect (node type, relation name, index name) of every scan node in an EXPLAIN JSON plan"""
+    found = [] if found is None else found
+    if plan.get('Node Type', '').endswith('Scan'):
+        found.append((plan['Node Type'], plan.get('Relation Name'), plan.get('Index Name')))
+    for child in plan.get('Plans', []):
+        _scans(child, found)
+    return found
+
+
+def explain(statement):
+    """EXPLAIN (FORMAT JSON) a Query or Select and return the top plan node"""
+    if hasattr(statement, 'statement'):
+        statement = statement.statement
+    compiled = statement.compile(dialect=postgresql.dialect())
+    connection = db.session.connection()
+    result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+    return result.scalar()[0]['Plan']
+
+
+def table_pages():
+    """Refresh planner statistics and return {table: pages} for the app's tables"""
+    db.session.execute(db.text("ANALYZE"))
+    rows = db.session.execute(db.text(
+        "SELECT relname, relpages FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+    ))
+    return dict(rows.all())
+
+
+def _sample_ids():
+    """Analysis with the most segments and its experiment, as the worst case for the view queries"""
+    row = (db.session.query(NlpAnalysis.id, NlpAnalysis.experiment_id)
+           .order_by(NlpAnalysis.total_segments.desc().nulls_last())
+           .first())
+    return row or (1, 1)
+
+
+def check_query_plans(analysis_id=None, experiment_id=None):
+    """
+    Plan every main view query with the normal planner settings against the
+    data in the database (seed one with benchmarks.seed) and check that it
+    uses its expected index and no sequential scan of a large table.
+
+    Queries whose tables are all below MIN_PAGES are not judged: a scan of a
+    few pages is legitimately cheaper than an index, so their plans say
+    nothing about production.
+    Returns ({query name: [problems]} for failing queries, [queries not judged]).
+    """
+    failures, not_judged = {}, []
+    try:
+        pages = table_pages()
+        if analysis_id is None:
+            analysis_id, sample_experiment = _sample_ids()
+            experiment_id = sample_experiment if experiment_id is None else experiment_id
+
+        for name, query in view_queries(analysis_id, experiment_id).items():
+            table, index = EXPECTED_INDEXES[name]
+            scans = _scans(explain(query))
+            large = {relation for _, relation, _ in scans
+                     if relation in LARGE_TABLES and pages.get(relation, 0) >= MIN_PAGES}
+            if pages.get(table, 0) >= MIN_PAGES:
+                large.add(table)
+            if not large:
+                not_judged.append(name)
+                continue
+
+            problems = [f"Seq Scan on {relation}" for node, relation, _ in scans
+                        if node == 'Seq Scan' and relation in large]
+            if index not in {index_name for _, _, index_name in scans}:
+                problems.append(f"{index} not used")
+            if problems:
+                failures[name] = problems
+    finally:
+        db.session.rollback()
+
+    return failures, not_judged
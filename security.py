@@ -0,0 +1,108 @@
+import time
+from threading import Lock
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from flask import current_app
+from flask_login import UserMixin
+from werkzeug.security import check_password_hash
+from models import db, User
+
+_hashers = {}
+
+
+def _hasher():
+    """argon2id hasher with the configured cost, built once per setting"""
+    config = current_app.config
+    params = (config.get('ARGON2_TIME_COST', 3),
+              config.get('ARGON2_MEMORY_COST', 65536),
+              config.get('ARGON2_PARALLELISM', 4))
+    if params not in _hashers:
+        _hashers[params] = PasswordHasher(time_cost=params[0], memory_cost=params[1],
+                                          parallelism=params[2])
+    return _hashers[params]
+
+
+def hash_password(password):
+    return _hasher().hash(password)
+
+
+def verify_password(stored_hash, password):
+    """Checks argon2 hashes and the legacy werkzeug pbkdf2:sha256 ones"""
+    if not stored_hash or not password:
+        return False
+    if not stored_hash.startswith('$argon2'):
+        return check_password_hash(stored_hash, password)
+    try:
+        return _hasher().verify(stored_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def needs_rehash(stored_hash):
+    """Legacy pbkdf2 hashes, and argon2 hashes made with a different cost"""
+    if not stored_hash.startswith('$argon2'):
+        return True
+    return _hasher().check_needs_rehash(stored_hash)
+
+
+def authenticate(user, password):
+    """
+    Verify a login and, on success, upgrade the stored hash to argon2id with
+    the current cost if it is a legacy or outdated one.
+    """
+    if not verify_password(user.password, password):
+        return False
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+        db.session.commit()
+        invalidate_user(user.id)
+    return True
+
+
+class CachedUser(UserMixin):
+    """Read-only snapshot of a User row, safe to share between requests"""
+
+    FIELDS = ('id', 'email', 'password', 'first_name', 'last_name')
+
+    def __init__(self, user):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(user, field))
+
+    def __repr__(self):
+        return f"<Name {self.first_name} {self.last_name}>"
+
+
+_identities = {}
+_identities_lock = Lock()
+
+
+def load_cached_user(user_id):
+    """
+    user_loader with a short per-process TTL cache (USER_CACHE_TTL seconds,
+    0 disables), saving a database round trip on most authenticated requests.
+    """
+    ttl = current_app.config.get('USER_CACHE_TTL', 30)
+    if ttl <= 0:
+        return db.session.get(User, user_id)
+
+    now = time.monotonic()
+    with _identities_lock:
+        entry = _identities.get(user_id)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        invalidate_user(user_id)
+        return None
+    snapshot = CachedUser(user)
+    with _identities_lock:
+        _identities[user_id] = (now + ttl, snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id):
+    """Drop a cached identity after the user row changed"""
+    with _identities_lock:
+        _identities.pop(user_id, None)
@@ -0,0 +1,141 @@
+import threading
+
+from sqlalchemy import func
+
+from models import db, EmotionSummary, NlpAnalysis
+
+SIMILARITY_METRICS = ('cosine', 'jensen_shannon')
+
+
+class EmotionSimilarityIndex:
+    """
+    Cached (experiments x emotions) matrix of emotion distributions, built from
+    EmotionSummary.emotion_percentages. Rows are kept as probability
+    distributions so cosine and Jensen-Shannon can be computed for every
+    experiment at once with array operations.
+
+    The cache is per process. insert_analysis_data updates the importing
+    process's rows directly. Other workers rebuild the matrix when the set of
+    summaries changes; a cheap count/sum signature over summary ids and their
+    experiments catches out-of-order commits and deleted experiments. numpy
+    is imported on first use, so workers that never serve a similarity
+    request don't load it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.emotions = []
+        self.experiment_ids = []
+        self.matrix = None
+        self._rows = {}
+        self._signature = None
+
+    def _upsert_many(self, items):
+        """Insert or replace rows for (experiment_id, percentages) pairs in one pass"""
+        import numpy as np
+
+        items = [(experiment_id, percentages or {}) for experiment_id, percentages in items]
+
+        # Grow columns for unseen emotion labels and rows for unseen experiments once
+        new_emotions = {emotion for _, percentages in items for emotion in percentages}
+        new_emotions = sorted(new_emotions - set(self.emotions))
+        self.emotions.extend(new_emotions)
+
+        new_ids = [experiment_id for experiment_id, _ in dict(items).items()
+                   if experiment_id not in self._rows]
+        for experiment_id in new_ids:
+            self._rows[experiment_id] = len(self.experiment_ids)
+            self.experiment_ids.append(experiment_id)
+
+        if self.matrix is None:
+            self.matrix = np.zeros((0, 0))
+        self.matrix = np.pad(self.matrix, ((0, len(new_ids)), (0, len(new_emotions))))
+        columns = {emotion: idx for idx, emotion in enumerate(self.emotions)}
+
+        for experiment_id, percentages in items:
+            row = self._rows[experiment_id]
+            self.matrix[row] = 0.0
+            for emotion, value in percentages.items():
+                self.matrix[row, columns[emotion]] = float(value or 0.0)
+
+            total = self.matrix[row].sum()
+            if total > 0:
+                self.matrix[row] /= total
+
+    def add_analysis(self, experiment_id, percentages):
+        """Incremental row update after an import (refresh() rebuilds to the same rows)"""
+        with self._lock:
+            self._upsert_many([(experiment_id, percentages)])
+
+    def _summaries(self):
+        """Summaries linked to an experiment, as a join on NlpAnalysis"""
+        return (db.session.query()
+                .select_from(EmotionSummary)
+                .join(NlpAnalysis, NlpAnalysis.id == EmotionSummary.analysis_id)
+                .filter(NlpAnalysis.experiment_id.isnot(None)))
+
+    def refresh(self):
+        """Rebuild the matrix when summaries were added, deleted or relinked since the last load"""
+        with self._lock:
+            signature = tuple(int(value) for value in self._summaries().add_columns(
+                func.count(EmotionSummary.id),
+                func.coalesce(func.sum(EmotionSummary.id), 0),
+                func.coalesce(func.sum(NlpAnalysis.experiment_id), 0)
+            ).one())
+            if signature == self._signature:
+                return
+
+            rows = (self._summaries()
+                    .add_columns(NlpAnalysis.experiment_id, EmotionSummary.emotion_percentages)
+                    .order_by(EmotionSummary.id)
+                    .all())
+            self.emotions, self.experiment_ids, self.matrix, self._rows = [], [], None, {}
+            self._upsert_many(rows)
+            self._signature = signature
+
+    def distances(self, experiment_id, metric='cosine'):
+        """Distance from one experiment to every cached experiment (0 = identical)"""
+        import numpy as np
+
+        row = self._rows.get(experiment_id)
+        if row is None:
+            return None
+
+        matrix = self.matrix
+        target = matrix[row]
+
+        if metric == 'jensen_shannon':
+            mixture = (matrix + target) / 2.0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                left = np.where(matrix > 0, matrix * np.log2(matrix / mixture), 0.0)
+                right = np.where(target > 0, target * np.log2(target / mixture), 0.0)
+            divergence = 0.5 * left.sum(axis=1) + 0.5 * right.sum(axis=1)
+            return np.sqrt(np.clip(divergence, 0.0, 1.0))
+
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(target)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cosine = np.where(norms > 0, matrix @ target / norms, 0.0)
+        return 1.0 - cosine
+
+    def similar(self, experiment_id, metric='cosine', limit=10):
+        """Closest experiments as a list of (experiment_id, distance)"""
+        import numpy as np
+
+        self.refresh()
+        with self._lock:
+            distances = self.distances(experiment_id, metric)
+            if distances is None:
+                return None
+
+            distances = distances.copy()
+            distances[self._rows[experiment_id]] = np.inf  # exclude itself
+            limit = min(limit, len(distances) - 1)
+            if limit <= 0:
+                return []
+
+            nearest = np.argpartition(distances, limit - 1)[:limit]
+            nearest = nearest[np.argsort(distances[nearest])]
+            return [(self.experiment_ids[i], float(distances[i])) for i in nearest]
+
+
+similarity_index = EmotionSimilarityIndex()
@@ -1,11 +1,17 @@
 from datetime import datetime
-from main import app
+from flask import current_app
 from models import (
     db, NlpAnalysis, EmotionSummary, TimelineSegment, ChartBin,
     TranscriptSummary, Keyword, TopicSentiment, DetectedQuestion,
     DetectedAction, TextInsight, Experiment
 )
 from db_names import Columns
+from charts import build_bin_pyramid, format_timestamp
+from emotion_stats import topic_statistics, transition_statistics
+from fragments import fragment_cache
+from similarity import similarity_index
+from sync.emotion_trends import segment_sums, update_emotion_trends
+from sync.keyword_index import update_keyword_index
 
 
 def find_or_create_experiment(video_name, date_folder, session_folder):
@@ -20,7 +26,7 @@ def find_or_create_experiment(video_name, date_folder, session_folder):
     ).first()
     
     if exp:
-        app.logger.info(f"Found existing experiment: '{exp.title}'")
+        current_app.logger.info(f"Found existing experiment: '{exp.title}'")
         return exp
     
     # Strategy 2: Try to find by date
@@ -36,13 +42,13 @@ def find_or_create_experiment(video_name, date_folder, session_folder):
             ).first()
             
             if exp:
-                app.logger.info(f"Found experiment by date: '{exp.title}'")
+                current_app.logger.info(f"Found experiment by date: '{exp.title}'")
                 return exp
     except:
         pass
     
     # Strategy 3: Create a new experiment automatically
-    app.logger.info(f"Creating new experiment from NLP analysis...")
+    current_app.logger.info(f"Creating new experiment from NLP analysis...")
     
     try:
         date_parts = date_folder.split('-')
@@ -69,7 +75,7 @@ def find_or_create_experiment(video_name, date_folder, session_folder):
     db.session.add(new_exp)
     db.session.flush()
     
-    app.logger.info(f"Created new experiment: '{title}' (ID: {new_exp.id})")
+    current_app.logger.info(f"Created new experiment: '{title}' (ID: {new_exp.id})")
     return new_exp
 
 
@@ -84,11 +90,11 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
         has_keywords = 'keyword_cloud' in session_data
         has_summary = 'summary' in session_data
         
-        app.logger.info(f"Files: sentiment={has_sentiment}, insights={has_insights}, "
+        current_app.logger.info(f"Files: sentiment={has_sentiment}, insights={has_insights}, "
                                f"chart={has_chart}, keywords={has_keywords}, summary={has_summary}")
         
         if not has_sentiment:
-            app.logger.error("Cannot proceed without sentiment.json")
+            current_app.logger.error("Cannot proceed without sentiment.json")
             return None
         
         sentiment_data = session_data['sentiment']
@@ -106,8 +112,8 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
         ).first()
         
         if existing_analysis:
-            app.logger.info(f"Experiment already has analysis (ID: {existing_analysis.id})")
-            app.logger.info(f"Skipping to avoid duplicates...")
+            current_app.logger.info(f"Experiment already has analysis (ID: {existing_analysis.id})")
+            current_app.logger.info(f"Skipping to avoid duplicates...")
             return existing_analysis.id
         
         # 1. Create NlpAnalysis (root) - single record, use ORM
@@ -128,7 +134,7 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
         )
         db.session.add(analysis)
         db.session.flush()  # Get analysis.id
-        app.logger.info(f"Created NlpAnalysis (ID: {analysis.id})")
+        current_app.logger.info(f"Created NlpAnalysis (ID: {analysis.id})")
         
         # 2. Create EmotionSummary - single record
         emotion_summary = EmotionSummary(
@@ -138,7 +144,7 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
             primary_emotion_counts=sentiment_summary.get('primary_emotion_counts', {})
         )
         db.session.add(emotion_summary)
-        app.logger.info(f"Created EmotionSummary")
+        current_app.logger.info(f"Created EmotionSummary")
         
         # 3. BULK INSERT TimelineSegments using constants
         detailed_analyses = sentiment_data.get('detailed_analyses', [])
@@ -188,7 +194,18 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
         # Bulk insert all segments at once
         if timeline_segments_data:
             db.session.bulk_insert_mappings(TimelineSegment, timeline_segments_data)
-            app.logger.info(f"Bulk inserted {len(timeline_segments_data)} TimelineSegments")
+            current_app.logger.info(f"Bulk inserted {len(timeline_segments_data)} TimelineSegments")
+        
+        # 3b. Emotion flow: transition matrix and stability from the ordered segments
+        transitions, stability = transition_statistics(
+            [seg[Columns.PRIMARY_EMOTION] for seg in timeline_segments_data]
+        )
+        emotion_summary.emotion_transitions = transitions
+        emotion_summary.stability_score = stability
+        
+        # 3c. Fold the segments into the day / week emotion trend rollups
+        update_emotion_trends(experiment, analysis.dominant_emotion,
+                              segment_sums(timeline_segments_data))
         
         # 4. BULK INSERT ChartBins using constants
         if has_chart and 'timeline' in chart_data:
@@ -210,7 +227,35 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
             
             if chart_bins_data:
                 db.session.bulk_insert_mappings(ChartBin, chart_bins_data)
-                app.logger.info(f"Bulk inserted {len(chart_bins_data)} ChartBins")
+                current_app.logger.info(f"Bulk inserted {len(chart_bins_data)} ChartBins")
+        
+        # 4b. BULK INSERT level-of-detail ChartBin pyramid computed from the segments
+        pyramid = build_bin_pyramid([
+            (seg[Columns.START_TIME], seg[Columns.PRIMARY_EMOTION], seg[Columns.CONFIDENCE_SCORE])
+            for seg in timeline_segments_data
+        ])
+        pyramid_bins_data = []
+        
+        for resolution, bins in pyramid.items():
+            for chart_bin in bins:
+                pyramid_bins_data.append({
+                    Columns.ANALYSIS_ID: analysis.id,
+                    Columns.RESOLUTION: float(resolution),
+                    Columns.BIN_INDEX: chart_bin['bin_index'],
+                    Columns.START_TIME: float(chart_bin['start_time']),
+                    Columns.END_TIME: float(chart_bin['end_time']),
+                    Columns.FORMATTED_START: format_timestamp(chart_bin['start_time']),
+                    Columns.FORMATTED_END: format_timestamp(chart_bin['end_time']),
+                    Columns.DOMINANT_EMOTION: chart_bin['dominant_emotion'],
+                    Columns.EMOTION_COUNTS: chart_bin['emotion_counts'],
+                    Columns.EMOTION_PERCENTAGES: chart_bin['emotion_percentages'],
+                    Columns.MEAN_CONFIDENCE: chart_bin['mean_confidence']
+                })
+        
+        if pyramid_bins_data:
+            db.session.bulk_insert_mappings(ChartBin, pyramid_bins_data)
+            current_app.logger.info(f"Bulk inserted {len(pyramid_bins_data)} pyramid ChartBins "
+                            f"({', '.join(f'{r}s' for r in pyramid)})")
         
         # 5. Create TranscriptSummary - single record
         if has_summary:
@@ -221,7 +266,7 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
                 num_segments=summary_data.get('num_segments', 0)
             )
             db.session.add(transcript_sum)
-            app.logger.info(f"Created TranscriptSummary")
+            current_app.logger.info(f"Created TranscriptSummary")
         
         # 6. BULK INSERT Keywords using constants
         if has_keywords:
@@ -240,28 +285,43 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
             
             if keywords_data:
                 db.session.bulk_insert_mappings(Keyword, keywords_data)
-                app.logger.info(f"Bulk inserted {len(keywords_data)} Keywords")
+                current_app.logger.info(f"Bulk inserted {len(keywords_data)} Keywords")
+            
+            # Fold the full keyword list into the global keyword rollups
+            indexed_terms = update_keyword_index(analysis.id, experiment, keyword_list)
+            current_app.logger.info(f"Indexed {indexed_terms} keyword terms")
         
         # 7. BULK INSERT TopicSentiments using constants
         if has_insights and 'topics' in insights_data:
-            topics = insights_data.get('topics', [])[:10]
+            topics = [topic_item for topic_item in insights_data.get('topics', [])[:10]
+                      if isinstance(topic_item, list) and len(topic_item) >= 2]
             topics_data = []
             
-            for topic_item in topics:
-                if isinstance(topic_item, list) and len(topic_item) >= 2:
-                    topics_data.append({
-                        Columns.ANALYSIS_ID: analysis.id,
-                        Columns.TOPIC_NAME: topic_item[0],
-                        Columns.TOTAL_SEGMENTS: topic_item[1],
-                        Columns.DOMINANT_EMOTION: 'neutral',
-                        Columns.AVERAGE_CONFIDENCE: 0.0,
-                        Columns.EMOTION_DIVERSITY: 0.0,
-                        Columns.TIME_SPAN_SECONDS: 0.0
-                    })
+            # Map segments to topics and aggregate per topic in one vectorised pass
+            topic_stats = topic_statistics(
+                [str(topic_item[0]) for topic_item in topics],
+                [seg[Columns.TEXT_CONTENT] for seg in timeline_segments_data],
+                [seg[Columns.PRIMARY_EMOTION] for seg in timeline_segments_data],
+                [seg[Columns.CONFIDENCE_SCORE] for seg in timeline_segments_data],
+                [seg[Columns.START_TIME] for seg in timeline_segments_data],
+                [seg[Columns.END_TIME] for seg in timeline_segments_data]
+            )
+            
+            for topic_item, stats in zip(topics, topic_stats):
+                topics_data.append({
+                    Columns.ANALYSIS_ID: analysis.id,
+                    Columns.TOPIC_NAME: topic_item[0],
+                    Columns.TOTAL_SEGMENTS: topic_item[1],
+                    Columns.DOMINANT_EMOTION: stats['dominant_emotion'],
+                    Columns.AVERAGE_CONFIDENCE: stats['average_confidence'],
+                    Columns.EMOTION_DIVERSITY: stats['emotion_diversity'],
+                    Columns.TIME_SPAN_SECONDS: stats['time_span_seconds'],
+                    Columns.SAMPLE_SEGMENTS: stats['sample_segments']
+                })
             
             if topics_data:
                 db.session.bulk_insert_mappings(TopicSentiment, topics_data)
-                app.logger.info(f"Bulk inserted {len(topics_data)} TopicSentiments")
+                current_app.logger.info(f"Bulk inserted {len(topics_data)} TopicSentiments")
         
         # 8. BULK INSERT DetectedQuestions using constants
         if has_insights:
@@ -282,7 +342,7 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
             
             if questions_data:
                 db.session.bulk_insert_mappings(DetectedQuestion, questions_data)
-                app.logger.info(f"Bulk inserted {len(questions_data)} DetectedQuestions")
+                current_app.logger.info(f"Bulk inserted {len(questions_data)} DetectedQuestions")
         
         # 9. BULK INSERT DetectedActions using constants
         if has_insights:
@@ -302,7 +362,7 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
             
             if actions_data:
                 db.session.bulk_insert_mappings(DetectedAction, actions_data)
-                app.logger.info(f"Bulk inserted {len(actions_data)} DetectedActions")
+                current_app.logger.info(f"Bulk inserted {len(actions_data)} DetectedActions")
         
         # 10. Create TextInsight - single record
         if has_insights:
@@ -317,18 +377,44 @@ def insert_analysis_data(session_data, date_folder, session_folder, video_name):
                 avg_word_length=text_stats.get('avg_word_length', 0.0)
             )
             db.session.add(text_insight)
-            app.logger.info(f"Created TextInsight")
+            current_app.logger.info(f"Created TextInsight")
+        
+        # Cards and selector options show the analysed state, re-render them
+        experiment.updated_at = datetime.utcnow()
         
         # Single commit at the end
         db.session.commit()
-        app.logger.info(f"✓ NlpAnalysis ID: {analysis.id} successfully added")
-        app.logger.info(f"✓ Linked to Experiment: '{experiment.title}' (ID: {experiment.id})")
+        fragment_cache.invalidate(experiment.id)
+        current_app.logger.info(f"✓ NlpAnalysis ID: {analysis.id} successfully added")
+        current_app.logger.info(f"✓ Linked to Experiment: '{experiment.title}' (ID: {experiment.id})")
+        
+        # Keep this process' similarity matrix current without a full rebuild
+        similarity_index.add_analysis(experiment.id, sentiment_summary.get('emotion_percentages', {}))
         
         return analysis.id
         
     except Exception as e:
         db.session.rollback()
-        app.logger.error(f"Error inserting analysis data: {str(e)}")
+        current_app.logger.error(f"Error inserting analysis data: {str(e)}")
         import traceback
-        app.logger.error(traceback.format_exc())
-        return None
\ No newline at end of file
+        current_app.logger.error(traceback.format_exc())
+        return None
+
+
+def backfill_emotion_transitions():
+    """
+    Compute emotion_transitions / stability_score for analyses imported before
+    they were filled at import. Returns the number of summaries updated.
+    """
+    summaries = EmotionSummary.query.filter(EmotionSummary.emotion_transitions.is_(None)).all()
+    
+    for summary in summaries:
+        emotions = [emotion for (emotion,) in
+                    db.session.query(TimelineSegment.primary_emotion)
+                    .filter(TimelineSegment.analysis_id == summary.analysis_id)
+                    .order_by(TimelineSegment.start_time)]
+        summary.emotion_transitions, summary.stability_score = transition_statistics(emotions)
+    
+    db.session.commit()
+    current_app.logger.info(f"Backfilled emotion transitions for {len(summaries)} analyses")
+    return len(summaries)
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import db, EmotionTrend, Experiment, NlpAnalysis, TimelineSegment
+from db_names import Columns
+from sync.keyword_index import ROLLUP_SCOPE_DAY, experiment_scopes
+
+TREND_GRANULARITIES = ('day', 'week')
+
+# Per-emotion sums in this order: segments, confidence, sentiment score, positive, negative
+_EMPTY_SUMS = (0, 0.0, 0.0, 0, 0)
+
+
+def bucket_start(date, granularity):
+    """First day of the bucket a date falls in (weeks start on Monday)"""
+    date = date.date() if hasattr(date, 'date') else date
+    if granularity == 'week':
+        return date - timedelta(days=date.weekday())
+    return date
+
+
+def segment_sums(segments):
+    """Per-emotion sums for one analysis from its segment dicts (as bulk inserted)"""
+    sums = {}
+    for seg in segments:
+        emotion = seg.get(Columns.PRIMARY_EMOTION) or 'neutral'
+        label = (seg.get(Columns.SENTIMENT_LABEL) or '').lower()
+        count, confidence, sentiment, positive, negative = sums.get(emotion, _EMPTY_SUMS)
+        sums[emotion] = (count + 1,
+                         confidence + (seg.get(Columns.CONFIDENCE_SCORE) or 0.0),
+                         sentiment + (seg.get(Columns.SENTIMENT_SCORE) or 0.0),
+                         positive + (label == 'positive'),
+                         negative + (label == 'negative'))
+    return sums
+
+
+def update_emotion_trends(experiment, dominant_emotion, sums):
+    """
+    Fold one analysis' per-emotion sums into the day and week buckets of its
+    experiment date, overall and per tag, with ON CONFLICT upserts. Runs in the
+    caller's transaction so the rollup commits with the import. Experiments
+    without a date have no place on a time axis and are skipped.
+    """
+    if experiment.date is None:
+        return 0
+
+    dominant_emotion = dominant_emotion or 'neutral'
+    sums = dict(sums)
+    sums.setdefault(dominant_emotion, _EMPTY_SUMS)
+
+    scopes = [(scope, scope_key) for scope, scope_key in experiment_scopes(experiment)
+              if scope != ROLLUP_SCOPE_DAY]
+    rows = [{
+        Columns.SCOPE: scope,
+        Columns.SCOPE_KEY: scope_key,
+        Columns.GRANULARITY: granularity,
+        Columns.BUCKET_START: bucket_start(experiment.date, granularity),
+        Columns.EMOTION: emotion,
+        Columns.EXPERIMENT_COUNT: int(emotion == dominant_emotion),
+        Columns.SEGMENT_COUNT: count,
+        Columns.CONFIDENCE_SUM: confidence,
+        Columns.SENTIMENT_SUM: sentiment,
+        Columns.POSITIVE_SEGMENTS: positive,
+        Columns.NEGATIVE_SEGMENTS: negative
+    } for scope, scope_key in scopes
+      for granularity in TREND_GRANULARITIES
+      for emotion, (count, confidence, sentiment, positive, negative) in sums.items()]
+
+    stmt = pg_insert(EmotionTrend).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Columns.SCOPE, Columns.SCOPE_KEY, Columns.GRANULARITY,
+                        Columns.BUCKET_START, Columns.EMOTION],
+        set_={column: getattr(EmotionTrend, column) + getattr(stmt.excluded, column)
+              for column in (Columns.EXPERIMENT_COUNT, Columns.SEGMENT_COUNT,
+                             Columns.CONFIDENCE_SUM, Columns.SENTIMENT_SUM,
+                             Columns.POSITIVE_SEGMENTS, Columns.NEGATIVE_SEGMENTS)}
+    )
+    db.session.execute(stmt)
+    return len(rows)
+
+
+def rebuild_emotion_trends():
+    """
+    Rebuild the trend rollups from the stored timeline segments, for analyses
+    imported before they existed or after experiment dates or tags changed.
+    Returns the number of analyses rolled up.
+    """
+    db.session.query(EmotionTrend).delete()
+
+    label = func.lower(TimelineSegment.sentiment_label)
+    grouped = (db.session.query(
+                   TimelineSegment.analysis_id,
+                   TimelineSegment.primary_emotion,
+                   func.count(TimelineSegment.id),
+                   func.coalesce(func.sum(TimelineSegment.confidence_score), 0.0),
+                   func.coalesce(func.sum(TimelineSegment.sentiment_score), 0.0),
+                   func.sum(case((label == 'positive', 1), else_=0)),
+                   func.sum(case((label == 'negative', 1), else_=0)))
+               .group_by(TimelineSegment.analysis_id, TimelineSegment.primary_emotion))
+    sums = {}
+    for analysis_id, emotion, *values in grouped:
+        # Segments without an emotion count as neutral, as they do at import
+        per_emotion = sums.setdefault(analysis_id, {})
+        previous = per_emotion.get(emotion or 'neutral', _EMPTY_SUMS)
+        per_emotion[emotion or 'neutral'] = tuple(a + b for a, b in zip(previous, values))
+
+    analyses = (db.session.query(NlpAnalysis.id, NlpAnalysis.dominant_emotion, Experiment)
+                .join(Experiment, Experiment.id == NlpAnalysis.experiment_id)
+                .all())
+
+    rolled_up = 0
+    for analysis_id, dominant_emotion, experiment in analyses:
+        if update_emotion_trends(experiment, dominant_emotion, sums.get(analysis_id, {})):
+            rolled_up += 1
+
+    db.session.commit()
+    current_app.logger.info(f"Rebuilt emotion trends from {rolled_up} analyses")
+    return rolled_up
@@ -0,0 +1,95 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select, update
+from models import db, SyncJob
+
+# Minimum seconds between progress writes; skipped files are checked quickly
+PROGRESS_INTERVAL = 0.5
+
+# An active job that has not reported for this long belongs to a dead worker
+STALE_AFTER = timedelta(minutes=10)
+
+# Postgres advisory lock key serialising "is a sync running? if not, queue one"
+SYNC_START_LOCK = 4207311
+
+# One sync at a time per process, off the request threads
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sync-job')
+
+
+class JobProgress:
+    """
+    Progress callback for sync_new_analyses that writes the job row on its own
+    short transaction, independent of the import session and its rollbacks.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.state = {}
+        self.last_write = 0.0
+
+    def __call__(self, force=False, **fields):
+        self.state.update(fields)
+        now = time.monotonic()
+        if not force and now - self.last_write < PROGRESS_INTERVAL:
+            return
+        self.last_write = now
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(SyncJob)
+                .where(SyncJob.id == self.job_id)
+                .values(updated_at=datetime.utcnow(), **self.state)
+            )
+
+
+def active_job():
+    """The queued or running sync job, if any worker is currently syncing"""
+    cutoff = datetime.utcnow() - STALE_AFTER
+    return (SyncJob.query
+            .filter(SyncJob.status.in_(SyncJob.ACTIVE), SyncJob.updated_at >= cutoff)
+            .order_by(SyncJob.created_at.desc())
+            .first())
+
+
+def start_sync_job(max_imports=None):
+    """
+    Queue a background MinIO sync and return (job, created). If a sync is
+    already running that job is returned instead of starting a second one.
+    """
+    # Without the lock two workers could both see no active job and both start one.
+    # The transaction-level lock is released by the commit (or rollback) below.
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(select(func.pg_advisory_xact_lock(SYNC_START_LOCK)))
+
+    job = active_job()
+    if job:
+        db.session.rollback()
+        return job, False
+
+    job = SyncJob(id=uuid.uuid4().hex, status='queued', max_imports=max_imports)
+    db.session.add(job)
+    db.session.commit()
+
+    _executor.submit(_run_job, current_app._get_current_object(), job.id, max_imports)
+    return job, True
+
+
+def _run_job(app, job_id, max_imports):
+    with app.app_context():
+        progress = JobProgress(job_id)
+        progress(force=True, status='running', started_at=datetime.utcnow())
+        try:
+            from sync.minio_sync import sync_new_analyses
+            result = sync_new_analyses(max_imports=max_imports, progress=progress)
+            progress(force=True, status='finished', finished_at=datetime.utcnow(),
+                     current_file=None, imported=result['new_imports'],
+                     skipped=result['skipped'], failed=result['errors'])
+        except Exception as e:
+            app.logger.error(f"Sync job {job_id} failed: {e}")
+            import traceback
+            app.logger.error(traceback.format_exc())
+            progress(force=True, status='failed', finished_at=datetime.utcnow(),
+                     current_file=None, error=str(e))
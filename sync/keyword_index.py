@@ -0,0 +1,105 @@
+from flask import current_app
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import db, Experiment, Keyword, KeywordPosting, KeywordRollup, NlpAnalysis
+from db_names import Columns
+
+ROLLUP_SCOPE_ALL = 'all'
+ROLLUP_SCOPE_TAG = 'tag'
+ROLLUP_SCOPE_DAY = 'day'
+
+
+def normalize_term(text):
+    """Lowercase and collapse whitespace so 'Too  Salty' and 'too salty' share a row"""
+    return ' '.join((text or '').lower().split())[:100]
+
+
+def experiment_scopes(experiment):
+    """(scope, scope_key) pairs an experiment's keywords are rolled up into"""
+    scopes = [(ROLLUP_SCOPE_ALL, '')]
+    if experiment.tags:
+        tags = {tag.strip() for tag in experiment.tags.split(',') if tag.strip()}
+        scopes += [(ROLLUP_SCOPE_TAG, tag) for tag in sorted(tags)]
+    if experiment.date:
+        scopes.append((ROLLUP_SCOPE_DAY, experiment.date.strftime('%Y-%m-%d')))
+    return scopes
+
+
+def update_keyword_index(analysis_id, experiment, keyword_list):
+    """
+    Fold one analysis' keywords into the global rollups with ON CONFLICT upserts.
+    Runs inside the caller's transaction so the index commits with the import.
+    """
+    terms = {}
+    for kw in keyword_list:
+        term = normalize_term(kw.get('text'))
+        if not term:
+            continue
+        value = kw.get('value', 0) or 0
+        relevance = kw.get('relevance_score', 0.0) or 0.0
+        if term in terms:
+            terms[term][0] += value
+            terms[term][1] = max(terms[term][1], relevance)
+        else:
+            terms[term] = [value, relevance]
+
+    if not terms:
+        return 0
+
+    postings = [{
+        Columns.TERM: term,
+        Columns.ANALYSIS_ID: analysis_id,
+        Columns.EXPERIMENT_ID: experiment.id,
+        Columns.VALUE: value,
+        Columns.RELEVANCE_SCORE: relevance
+    } for term, (value, relevance) in terms.items()]
+    db.session.execute(pg_insert(KeywordPosting).values(postings).on_conflict_do_nothing())
+
+    rollups = [{
+        Columns.SCOPE: scope,
+        Columns.SCOPE_KEY: scope_key,
+        Columns.TERM: term,
+        Columns.DOCUMENT_FREQUENCY: 1,
+        Columns.TOTAL_COUNT: value,
+        Columns.RELEVANCE_SUM: relevance
+    } for scope, scope_key in experiment_scopes(experiment)
+      for term, (value, relevance) in terms.items()]
+
+    stmt = pg_insert(KeywordRollup).values(rollups)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Columns.SCOPE, Columns.SCOPE_KEY, Columns.TERM],
+        set_={
+            Columns.DOCUMENT_FREQUENCY: KeywordRollup.document_frequency + stmt.excluded.document_frequency,
+            Columns.TOTAL_COUNT: KeywordRollup.total_count + stmt.excluded.total_count,
+            Columns.RELEVANCE_SUM: KeywordRollup.relevance_sum + stmt.excluded.relevance_sum
+        }
+    )
+    db.session.execute(stmt)
+
+    return len(terms)
+
+
+def rebuild_keyword_index():
+    """
+    Rebuild the rollups from the stored keywords table, for analyses imported
+    before the index existed. Returns the number of analyses indexed.
+    """
+    db.session.query(KeywordRollup).delete()
+    db.session.query(KeywordPosting).delete()
+
+    analyses = (db.session.query(NlpAnalysis.id, Experiment)
+                .join(Experiment, Experiment.id == NlpAnalysis.experiment_id)
+                .all())
+
+    indexed = 0
+    for analysis_id, experiment in analyses:
+        keywords = (db.session.query(Keyword.text, Keyword.value, Keyword.relevance_score)
+                    .filter(Keyword.analysis_id == analysis_id)
+                    .all())
+        keyword_list = [{'text': text, 'value': value, 'relevance_score': relevance}
+                        for text, value, relevance in keywords]
+        if update_keyword_index(analysis_id, experiment, keyword_list):
+            indexed += 1
+
+    db.session.commit()
+    current_app.logger.info(f"Rebuilt keyword index from {indexed} analyses")
+    return indexed
@@ -1,6 +1,6 @@
 import json
 from minio import Minio
-from main import app
+from flask import current_app
 class MinIOService:
     def __init__(self):
         self.client = None
@@ -9,12 +9,12 @@ class MinIOService:
     def _init_client(self):
         """Initialize MinIO client with config"""
         self.client = Minio(
-            endpoint=app.config['MINIO_ENDPOINT'],
-            access_key=app.config['MINIO_ACCESS_KEY'],
-            secret_key=app.config['MINIO_SECRET_KEY'],
-            secure=app.config['MINIO_SECURE']
+            endpoint=current_app.config['MINIO_ENDPOINT'],
+            access_key=current_app.config['MINIO_ACCESS_KEY'],
+            secret_key=current_app.config['MINIO_SECRET_KEY'],
+            secure=current_app.config['MINIO_SECURE']
         )
-        self.bucket = app.config['MINIO_BUCKET']
+        self.bucket = current_app.config['MINIO_BUCKET']
     
     def list_analysis_files(self, prefix=""):
         """List all analysis files in bucket"""
@@ -42,7 +42,7 @@ class MinIOService:
             
             return analysis_files
         except Exception as e:
-            app.logger.error(f"Error listing MinIO files: {e}")
+            current_app.logger.error(f"Error listing MinIO files: {e}")
             return []
     
     def read_json_file(self, object_name):
@@ -53,7 +53,7 @@ class MinIOService:
             json_bytes = response.read()
             return json.loads(json_bytes.decode('utf-8'))
         except Exception as e:
-            app.logger.error(f"Error reading {object_name}: {str(e)[:100]}")
+            current_app.logger.error(f"Error reading {object_name}: {str(e)[:100]}")
             return None
         finally:
             if response:
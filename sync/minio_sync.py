@@ -1,23 +1,25 @@
 import time
 from datetime import datetime
-from main import app
+from flask import current_app
 from models import db, NlpAnalysis, Experiment
 from sync.minio_service import MinIOService
 from sync.data_import import insert_analysis_data
 
-def sync_new_analyses(max_imports=None):
+def sync_new_analyses(max_imports=None, progress=None):
     """
     Check MinIO for new analysis files and import them
     
     Args:
         max_imports (int, optional): Maximum number of files to import per run. 
                                      If None, imports all new files.
+        progress (callable, optional): Called with total_files, checked, imported,
+                                       skipped, failed and current_file as the sync advances.
     
     Returns:
         dict: Results containing new_imports, skipped, errors, and duration
     """
     start_time = time.time()
-    app.logger.info("Starting MinIO sync check...")
+    current_app.logger.info("Starting MinIO sync check...")
     
     minio_service = MinIOService()
 
@@ -26,22 +28,29 @@ def sync_new_analyses(max_imports=None):
     analysis_files = minio_service.list_analysis_files()
     list_duration = time.time() - list_start
 
-    app.logger.info(f"Found {len(analysis_files)} files in MinIO (took {list_duration:.2f}s)")
+    current_app.logger.info(f"Found {len(analysis_files)} files in MinIO (took {list_duration:.2f}s)")
     
     new_imports = 0
     skipped = 0
     errors = 0
     
+    def report(checked, current_file=None):
+        if progress:
+            progress(total_files=len(analysis_files), checked=checked, imported=new_imports,
+                     skipped=skipped, failed=errors, current_file=current_file)
+
+    report(0)
+
     for idx, file_info in enumerate(analysis_files, 1):
         # Stop if we hit the max import limit
         if max_imports and new_imports >= max_imports:
-            app.logger.info(f"Reached import limit ({max_imports}), will continue next cycle")
+            current_app.logger.info(f"Reached import limit ({max_imports}), will continue next cycle")
             break
         
         # Log progress every 10 files
         if idx % 10 == 0:
             elapsed = time.time() - start_time
-            app.logger.info(f"Progress: {idx}/{len(analysis_files)} files checked ({elapsed:.1f}s)")
+            current_app.logger.info(f"Progress: {idx}/{len(analysis_files)} files checked ({elapsed:.1f}s)")
         
         # Check if already imported by checking source_filename
         existing = NlpAnalysis.query.filter_by(
@@ -50,8 +59,10 @@ def sync_new_analyses(max_imports=None):
         
         if existing:
             skipped += 1
+            report(idx)
             continue
         
+        report(idx - 1, current_file=file_info['video_name'])
         try:
             file_start = time.time()
             
@@ -63,7 +74,9 @@ def sync_new_analyses(max_imports=None):
             )
             
             if not session_data or 'sentiment' not in session_data:
-                app.logger.warning(f"Incomplete data for {file_info['video_name']}")
+                errors += 1
+                current_app.logger.warning(f"Incomplete data for {file_info['video_name']}")
+                report(idx)
                 continue
             
             # Import using refactored function
@@ -78,16 +91,22 @@ def sync_new_analyses(max_imports=None):
             
             if analysis_id:
                 new_imports += 1
-                app.logger.info(f"✓ Imported {file_info['video_name']} in {file_duration:.2f}s (Analysis ID: {analysis_id})")
+                current_app.logger.info(f"✓ Imported {file_info['video_name']} in {file_duration:.2f}s (Analysis ID: {analysis_id})")
+            else:
+                # insert_analysis_data logs and rolls back its own failures
+                errors += 1
+                current_app.logger.error(f"✗ Import failed for {file_info['video_name']}")
             
         except Exception as e:
             errors += 1
-            app.logger.error(f"✗ Error importing {file_info['video_name']}: {str(e)}")
+            current_app.logger.error(f"✗ Error importing {file_info['video_name']}: {str(e)}")
             import traceback
-            app.logger.error(traceback.format_exc())
+            current_app.logger.error(traceback.format_exc())
+
+        report(idx)
     
     total_duration = time.time() - start_time
-    app.logger.info(f"Sync complete in {total_duration:.2f}s: {new_imports} new, {skipped} skipped, {errors} errors")
+    current_app.logger.info(f"Sync complete in {total_duration:.2f}s: {new_imports} new, {skipped} skipped, {errors} errors")
     
     return {
         'new_imports': new_imports,
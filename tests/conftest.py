@@ -0,0 +1,88 @@
+"""
+Integration tests run against a real, disposable Postgres database (the app
+relies on JSONB, tsvector and ON CONFLICT):
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost/tastelab_test python -m pytest tests
+
+Every table in that database is dropped and recreated; the tests are skipped
+when TEST_DATABASE_URL is not set.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+@pytest.fixture(scope='session')
+def app():
+    if not TEST_DATABASE_URL:
+        pytest.skip("Set TEST_DATABASE_URL to a disposable Postgres database")
+
+    from config import Config
+    from main import create_app
+    from models import db
+
+    class TestConfig(Config):
+        TESTING = True
+        LOGIN_DISABLED = True
+        SQLALCHEMY_DATABASE_URI = TEST_DATABASE_URL
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SQLALCHEMY_BINDS = {}
+        STATIC_PRECOMPRESS = False
+        QUERY_FANOUT_WORKERS = 0
+
+    app = create_app(TestConfig, migrations=False)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def session(app):
+    """db.session in an app context; rows are removed after each test"""
+    from models import db
+    with app.app_context():
+        yield db.session
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+
+@pytest.fixture
+def make_analysis(session):
+    """Experiment plus NlpAnalysis with the given segment texts"""
+    from datetime import datetime
+    from models import Experiment, NlpAnalysis, TimelineSegment
+
+    def make(title, texts, tags=None, date=None):
+        experiment = Experiment(title=title, tags=tags, date=date or datetime(2026, 1, 5))
+        session.add(experiment)
+        session.flush()
+        analysis = NlpAnalysis(experiment_id=experiment.id, source_filename=title,
+                               total_segments=len(texts))
+        session.add(analysis)
+        session.flush()
+        session.bulk_insert_mappings(TimelineSegment, [{
+            'analysis_id': analysis.id, 'segment_index': idx,
+            'start_time': float(idx), 'end_time': float(idx + 1),
+            'text_content': text, 'primary_emotion': 'neutral',
+            'sentiment_label': 'neutral', 'sentiment_score': 0.5, 'confidence_score': 0.5
+        } for idx, text in enumerate(texts)])
+        session.commit()
+        return experiment, analysis
+
+    return make
@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.mark.parametrize('body', [
+    {'ids': 5}, {'ids': {'a': 1}}, {'ids': [1.5]}, {'ids': [True]}, {'ids': [[1]]},
+    {'ids': ['x']}, {'ids': [1], 'fields': 5}, {'ids': [1], 'fields': [1]}, [1, 2],
+])
+def test_rejects_malformed_json(client, body):
+    response = client.post('/api/experiments/batch', json=body)
+    assert response.status_code == 400
+
+
+def test_accepts_lists_and_comma_separated_strings(client, make_analysis):
+    first, _ = make_analysis('First', ['a'])
+    second, _ = make_analysis('Second', ['b'])
+    expected = [first.id, second.id]
+
+    for body in ({'ids': [first.id, second.id]}, {'ids': f"{first.id}, {second.id}"},
+                 {'ids': [str(first.id), str(second.id)], 'fields': 'metadata'}):
+        response = client.post('/api/experiments/batch', json=body)
+        assert response.status_code == 200
+        assert [entry['id'] for entry in response.get_json()['experiments']] == expected
+
+    response = client.get('/api/experiments/batch', query_string={'ids': f"{first.id},{second.id}"})
+    assert [entry['id'] for entry in response.get_json()['experiments']] == expected
@@ -0,0 +1,26 @@
+from emotion_stats import topic_statistics
+
+
+def _stats(topic_names, texts):
+    count = len(texts)
+    return topic_statistics(topic_names, texts, ['joy'] * count, [0.5] * count,
+                            list(range(count)), list(range(1, count + 1)))
+
+
+def test_topics_differing_in_case_keep_their_own_stats():
+    stats = _stats(['salt', 'Salt'], ['The salt was strong', 'SALTY indeed', 'Sweet'])
+
+    assert [topic['matched_segments'] for topic in stats] == [2, 2]
+
+
+def test_blank_topic_names_match_nothing():
+    stats = _stats(['', '  ', None, 'salt'], ['Sweet', 'Salty'])
+
+    assert [topic['matched_segments'] for topic in stats] == [0, 0, 0, 1]
+
+
+def test_case_folding_mismatches_are_skipped():
+    stats = _stats(['istanbul', 'straße'], ['İstanbul style', 'STRASSE food', 'Straße food'])
+
+    assert stats[0]['matched_segments'] == 0
+    assert stats[1]['matched_segments'] >= 1
@@ -0,0 +1,20 @@
+import csv
+import io
+
+
+def _exported_experiments(client, **params):
+    response = client.get('/api/experiments/export/segments.csv', query_string=params)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    return {int(row['experiment_id']) for row in rows}
+
+
+def test_tag_filter_matches_whole_tags(client, make_analysis):
+    sweet, _ = make_analysis('Sweet', ['fine'], tags='Sweet')
+    listed, _ = make_analysis('Listed', ['fine'], tags=' Savoury ,Sweet , Crunchy')
+    bittersweet, _ = make_analysis('Bittersweet', ['fine'], tags='Bittersweet, Sweetened')
+    make_analysis('Untagged', ['fine'])
+
+    assert _exported_experiments(client, tag='Sweet') == {sweet.id, listed.id}
+    assert _exported_experiments(client, tag='Bittersweet') == {bittersweet.id}
+    assert _exported_experiments(client, tag='Crunchy') == {listed.id}
@@ -0,0 +1,10 @@
+def test_top_keywords_rejects_non_positive_k(session, client):
+    for k in ('0', '-5'):
+        response = client.get('/api/keywords/top', query_string={'k': k})
+        assert response.status_code == 400
+
+
+def test_top_keywords_accepts_k(session, client):
+    response = client.get('/api/keywords/top', query_string={'k': '5'})
+    assert response.status_code == 200
+    assert response.get_json() == {'keywords': []}
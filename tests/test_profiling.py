@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import event, exc, text
+
+from profiling import ENVIRON_KEY, RequestProfile, _after_cursor_execute, _before_cursor_execute
+
+
+@pytest.fixture
+def profiled_engine(app):
+    from models import db
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        yield engine
+        event.remove(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.remove(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def test_failed_statement_leaves_no_timer_on_the_connection(app, profiled_engine):
+    profile = RequestProfile()
+    with app.test_request_context(environ_base={ENVIRON_KEY: profile}):
+        with profiled_engine.connect() as connection:
+            with pytest.raises(exc.DataError):
+                connection.execute(text("SELECT 1 / 0"))
+            connection.rollback()
+            connection.execute(text("SELECT 1"))
+
+            assert 'profile_started' not in connection.info
+
+    assert [statement for statement, _, _ in profile.statements] == ["SELECT 1"]
@@ -0,0 +1,53 @@
+from models import TimelineSegment
+
+
+def _all_pages(client, **params):
+    results, pages, after = [], 0, None
+    while True:
+        query = dict(params, **({'after': after} if after else {}))
+        response = client.get('/api/search/transcripts', query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        results += body['results']
+        pages += 1
+        after = body['next']
+        if not after:
+            return results, pages
+
+
+def test_keyset_pages_through_tied_ranks(session, client, make_analysis):
+    # Identical sentences give every hit the same float4 rank
+    experiment, analysis = make_analysis('Salty soup', ['The soup is too salty today'] * 95 + [
+        'Too salty, far too salty, way too salty', 'Nothing to see here'
+    ])
+    expected = {segment_id for (segment_id,) in session.query(TimelineSegment.id)
+                .filter(TimelineSegment.analysis_id == analysis.id,
+                        TimelineSegment.text_content.ilike('%salty%'))}
+
+    results, pages = _all_pages(client, q='too salty', experiment_id=experiment.id, limit=10)
+
+    ids = [result['segment_id'] for result in results]
+    assert len(ids) == len(set(ids)) == 96
+    assert set(ids) == expected
+    assert pages == 10
+    # Best match first, the tied rows after it in id order
+    assert ids[0] == max(expected)
+
+
+def test_limit_must_be_positive(session, client, make_analysis):
+    make_analysis('Salty soup', ['The soup is too salty today'])
+
+    for limit in ('0', '-1'):
+        response = client.get('/api/search/transcripts', query_string={'q': 'salty', 'limit': limit})
+        assert response.status_code == 400
+
+
+def test_highlight_escapes_transcript_html(session, client, make_analysis):
+    make_analysis('Salty soup', ['Far too salty <img src=x onerror=alert(1)> & sweet'])
+
+    response = client.get('/api/search/transcripts', query_string={'q': 'salty'})
+
+    highlight = response.get_json()['results'][0]['highlight']
+    assert '<img' not in highlight
+    assert '&lt;img' in highlight
+    assert '<mark>salty</mark>' in highlight
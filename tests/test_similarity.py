@@ -0,0 +1,31 @@
+from models import EmotionSummary, Experiment
+from similarity import EmotionSimilarityIndex
+
+
+def _summarise(session, analysis, percentages, summary_id=None):
+    session.add(EmotionSummary(id=summary_id, analysis_id=analysis.id, emotion_percentages=percentages))
+    session.commit()
+
+
+def test_refresh_picks_up_out_of_order_commits_and_deletions(session, make_analysis):
+    index = EmotionSimilarityIndex()
+    first, first_analysis = make_analysis('First', ['a'])
+    second, second_analysis = make_analysis('Second', ['b'])
+    third, third_analysis = make_analysis('Third', ['c'])
+
+    _summarise(session, first_analysis, {'joy': 80, 'neutral': 20}, summary_id=1000)
+    index.refresh()
+    assert index.experiment_ids == [first.id]
+
+    # Committed after id 1000, e.g. by a slower concurrent import
+    _summarise(session, second_analysis, {'joy': 70, 'neutral': 30}, summary_id=10)
+    _summarise(session, third_analysis, {'anger': 90, 'neutral': 10}, summary_id=2000)
+    index.refresh()
+    assert sorted(index.experiment_ids) == sorted([first.id, second.id, third.id])
+    assert index.similar(first.id, limit=1)[0][0] == second.id
+
+    session.delete(session.get(Experiment, second.id))
+    session.commit()
+    index.refresh()
+    assert sorted(index.experiment_ids) == sorted([first.id, third.id])
+    assert [match_id for match_id, _ in index.similar(first.id)] == [third.id]
@@ -0,0 +1,71 @@
+import threading
+
+from models import SyncJob
+from sync import jobs, minio_sync
+
+
+class FakeMinIO:
+    FILES = [{'date_folder': '2026-01-05', 'session_folder': 'session_1', 'video_name': name}
+             for name in ('good', 'broken', 'incomplete')]
+
+    def list_analysis_files(self):
+        return self.FILES
+
+    def load_video_analysis_data(self, date_folder, session_folder, video_name):
+        return {} if video_name == 'incomplete' else {'sentiment': {}}
+
+
+def test_failed_imports_are_counted(session, monkeypatch):
+    monkeypatch.setattr(minio_sync, 'MinIOService', FakeMinIO)
+    # insert_analysis_data swallows its own errors and returns None
+    monkeypatch.setattr(minio_sync, 'insert_analysis_data',
+                        lambda data, date, folder, name: 1 if name == 'good' else None)
+    reports = []
+
+    result = minio_sync.sync_new_analyses(progress=lambda **fields: reports.append(fields))
+
+    assert result['new_imports'] == 1
+    assert result['errors'] == 2
+    assert reports[-1]['failed'] == 2
+    assert reports[-1]['checked'] == 3
+
+
+def test_concurrent_starts_queue_one_job(app, session, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(jobs._executor, 'submit', lambda *args: submitted.append(args))
+    barrier = threading.Barrier(4)
+    created = []
+
+    def start():
+        with app.test_request_context(method='POST'):
+            barrier.wait()
+            job, was_created = jobs.start_sync_job()
+            created.append(was_created)
+
+    threads = [threading.Thread(target=start) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(created) == [False, False, False, True]
+    assert len(submitted) == 1
+    assert session.query(SyncJob).count() == 1
+
+
+def test_status_asks_clients_to_poll_while_active(session, client):
+    from datetime import datetime, timedelta
+    from views import SYNC_POLL_INTERVAL
+
+    running = SyncJob(id='running', status='running', updated_at=datetime.utcnow())
+    stale = SyncJob(id='stale', status='running', updated_at=datetime.utcnow() - timedelta(hours=1))
+    finished = SyncJob(id='finished', status='completed', updated_at=datetime.utcnow())
+    session.add_all([running, stale, finished])
+    session.commit()
+
+    response = client.get('/admin/sync-jobs/running')
+    assert response.status_code == 200
+    assert response.headers['Retry-After'] == str(SYNC_POLL_INTERVAL)
+    for job_id in ('stale', 'finished'):
+        assert 'Retry-After' not in client.get(f'/admin/sync-jobs/{job_id}').headers
+    assert client.get('/admin/sync-jobs/stale').get_json()['stale'] is True
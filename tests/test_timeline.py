@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.mark.parametrize('route', ['timeline', 'charts'])
+@pytest.mark.parametrize('params', [
+    {'bin': 'nan'}, {'bin': 'inf'}, {'bin': '-inf'}, {'bin': '0'},
+    {'start': 'nan'}, {'end': 'inf'}, {'bin': '5', 'start': '-inf'},
+])
+def test_rejects_non_finite_ranges(client, make_analysis, route, params):
+    experiment, _ = make_analysis('Ranges', ['a', 'b', 'c'])
+    response = client.get(f'/api/experiment/{experiment.id}/{route}', query_string=params)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('route', ['timeline', 'charts'])
+def test_rebins_finite_range(client, make_analysis, route):
+    experiment, _ = make_analysis('Bins', ['a', 'b', 'c', 'd'])
+    response = client.get(f'/api/experiment/{experiment.id}/{route}',
+                          query_string={'bin': '2', 'start': '0', 'end': '4'})
+    assert response.status_code == 200
+    assert sum(b['segments'] for b in response.get_json()['bins']) == 4
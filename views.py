@@ -1,12 +1,36 @@
-from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+from flask import (
+    Blueprint, Response, current_app, flash, jsonify, make_response, redirect,
+    render_template, request, send_file, stream_with_context, url_for
+)
 from flask_login import current_user, login_required
-from werkzeug.security import check_password_hash
-from sqlalchemy import func
-from datetime import datetime
+from sqlalchemy import Float, cast, func, select, tuple_
+from datetime import datetime, timezone
+from functools import wraps
+from itertools import islice
+import hashlib
+import json
+import math
+from markupsafe import escape
+from database import use_primary
+from security import invalidate_user, verify_password
+from query_fanout import gather, start_queries
+from exports import (
+    EXPORT_DATASETS, EXPORT_FORMATS, experiment_filter, export_columns, export_query,
+    parquet_cleanup, stream_csv, write_parquet
+)
+from similarity import SIMILARITY_METRICS, similarity_index
+from sync.jobs import STALE_AFTER, start_sync_job
+from sync.emotion_trends import TREND_GRANULARITIES
+from sync.keyword_index import normalize_term
+from charts import (
+    PYRAMID_LEVELS, assemble_bins, build_timeline_payload, downsample_timeline,
+    pick_pyramid_level
+)
 from models import (
     db, User, Experiment, NlpAnalysis, EmotionSummary, 
     TimelineSegment, ChartBin, DetectedQuestion, DetectedAction, 
-    Keyword, TopicSentiment, TextInsight, TranscriptSummary
+    Keyword, TopicSentiment, TextInsight, TranscriptSummary,
+    KeywordPosting, KeywordRollup, EmotionTrend, SyncJob, analysis_child_stats, loader_profile
 )
 
 # Create blueprint
@@ -15,47 +39,77 @@ views = Blueprint("views", __name__)
 @views.route("/")
 @login_required
 def home():
+    # Independent dashboard aggregates run concurrently, each on its own
+    # pooled connection, while this thread loads the experiment list
+    month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0)
+    pending = start_queries(
+        total_experiments=lambda: Experiment.query.count(),
+        experiments_with_analysis=lambda: NlpAnalysis.query.filter(NlpAnalysis.experiment_id.isnot(None)).count(),
+        total_participants=lambda: db.session.query(func.sum(Experiment.participant_count)).scalar(),
+        avg_participants=lambda: db.session.query(func.avg(Experiment.participant_count)).scalar(),
+        completed_experiments=lambda: Experiment.query.filter_by(status='Completed').count(),
+        total_segments=lambda: db.session.query(func.sum(NlpAnalysis.total_segments)).scalar(),
+        tags=lambda: db.session.query(Experiment.tags).filter(Experiment.tags.isnot(None)).all(),
+        trend=lambda: (db.session.query(Experiment.title, Experiment.participant_count)
+                       .order_by(Experiment.date.asc()).limit(6).all()),
+        avg_duration=lambda: db.session.query(func.avg(Experiment.duration)).scalar(),
+        total_duration=lambda: db.session.query(func.sum(Experiment.duration)).scalar(),
+        this_month=lambda: Experiment.query.filter(Experiment.date >= month_start).count(),
+        top_experiments=lambda: (db.session.query(Experiment.title, Experiment.date,
+                                                  Experiment.participant_count)
+                                 .order_by(Experiment.participant_count.desc()).limit(10).all())
+    )
+
     # Get all experiments (which may have analysis data linked)
-    all_experiments = Experiment.query.order_by(Experiment.date.desc()).all()
+    all_experiments = (Experiment.query
+                       .options(*loader_profile('list'))
+                       .order_by(Experiment.date.desc())
+                       .all())
     
     # Get selected experiment from URL params
     selected_exp_id = request.args.get('exp_id', type=int)
     selected_experiment = None
     
     if selected_exp_id:
-        selected_experiment = Experiment.query.get(selected_exp_id)
+        selected_experiment = Experiment.query.options(*loader_profile('detail')).get(selected_exp_id)
     elif all_experiments:
         selected_experiment = all_experiments[0]
     
     # Get analysis data if available
     analysis = None
+    summary = None
+    analysis_counts = None
     if selected_experiment:
         analysis = selected_experiment.analysis
+    if analysis:
+        summary = analysis.emotion_summary
+        analysis_counts = analysis_child_stats([analysis.id])[analysis.id]
+
+    results = gather(pending)
     
     # --- Statistics for Dashboard ---
     stats = {
-        'total_experiments': Experiment.query.count(),
-        'experiments_with_analysis': NlpAnalysis.query.filter(NlpAnalysis.experiment_id.isnot(None)).count(),
-        'total_participants': db.session.query(func.sum(Experiment.participant_count)).scalar() or 0,
-        'avg_participants': round(db.session.query(func.avg(Experiment.participant_count)).scalar() or 0, 1),
-        'completed_experiments': Experiment.query.filter_by(status='Completed').count(),
-        'total_segments': db.session.query(func.sum(NlpAnalysis.total_segments)).scalar() or 0
+        'total_experiments': results['total_experiments'],
+        'experiments_with_analysis': results['experiments_with_analysis'],
+        'total_participants': results['total_participants'] or 0,
+        'avg_participants': round(results['avg_participants'] or 0, 1),
+        'completed_experiments': results['completed_experiments'],
+        'total_segments': results['total_segments'] or 0
     }
     
     # Recent activity list
-    recent_activity = Experiment.query.order_by(Experiment.date.desc()).limit(5).all()
+    recent_activity = all_experiments[:5]
     
     # Tag distribution
-    tags_query = db.session.query(Experiment.tags).filter(Experiment.tags.isnot(None)).all()
     tag_counts = {}
-    for (tags_str,) in tags_query:
+    for (tags_str,) in results['tags']:
         if tags_str:
             tags_list = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
             for tag in tags_list:
                 tag_counts[tag] = tag_counts.get(tag, 0) + 1
     
     # Participant trends (Timeline Chart)
-    trend_data = Experiment.query.order_by(Experiment.date.asc()).limit(6).all()
+    trend_data = results['trend']
     participant_trend = {
         'labels': [exp.title[:15] + '...' if len(exp.title) > 15 else exp.title for exp in trend_data],
         'data': [exp.participant_count or 0 for exp in trend_data]
@@ -63,23 +117,21 @@ def home():
     
     # Insights box
     insights = {
-        'avg_duration': int(db.session.query(func.avg(Experiment.duration)).scalar() or 0),
-        'total_duration': db.session.query(func.sum(Experiment.duration)).scalar() or 0,
-        'this_month': Experiment.query.filter(
-            Experiment.date >= datetime.now().replace(day=1, hour=0, minute=0, second=0)
-        ).count(),
+        'avg_duration': int(results['avg_duration'] or 0),
+        'total_duration': results['total_duration'] or 0,
+        'this_month': results['this_month'],
         'last_experiment': all_experiments[0] if all_experiments else None
     }
     
-    top_experiments = Experiment.query.order_by(
-        Experiment.participant_count.desc()
-    ).limit(10).all()
+    top_experiments = results['top_experiments']
     
     return render_template("home.html", 
                            user=current_user,
                            experiments=all_experiments,
                            selected_experiment=selected_experiment,
                            analysis=analysis,
+                           summary=summary,
+                           analysis_counts=analysis_counts,
                            stats=stats,
                            recent_activity=recent_activity,
                            tag_counts=tag_counts,
@@ -113,6 +165,7 @@ def experiments():
 
 
 @views.route('/experiments/add-experiment', methods=['GET', 'POST'])
+@use_primary
 @login_required
 def add_experiment():
     if request.method == 'POST':
@@ -157,22 +210,23 @@ def add_experiment():
 @views.route('/experiments/<int:experiment_id>')
 @login_required
 def view_experiment(experiment_id):
-    experiment = Experiment.query.get_or_404(experiment_id)
+    experiment = (Experiment.query
+                  .options(*loader_profile('detail'))
+                  .get_or_404(experiment_id))
     
     # Get analysis results linked to this experiment
     analysis = experiment.analysis
     
     summary = None
+    analysis_counts = None
     timeline_preview = []
     questions_preview = []
     keywords_preview = []
     
     if analysis:
         summary = analysis.emotion_summary
-        timeline_preview = (analysis.timeline_segments
-                            .order_by(TimelineSegment.start_time)
-                            .limit(10)
-                            .all())
+        analysis_counts = analysis_child_stats([analysis.id])[analysis.id]
+        timeline_preview = _timeline_preview(analysis.id)
         questions_preview = analysis.questions.limit(5).all()
         keywords_preview = analysis.keywords.order_by(Keyword.rank).limit(10).all()
 
@@ -181,6 +235,7 @@ def view_experiment(experiment_id):
                            experiment=experiment,
                            analysis=analysis,
                            summary=summary,
+                           analysis_counts=analysis_counts,
                            timeline_preview=timeline_preview,
                            questions_preview=questions_preview,
                            keywords_preview=keywords_preview)
@@ -201,25 +256,48 @@ def transcription():
     selected_experiment = None
     analysis = None
     timeline_data = []
+    timeline_chart = None
+    timeline_total = 0
     summary_data = None
     keywords_data = []
+    questions_preview = []
+    actions_preview = []
+    analysis_counts = None
     
-    exp_id = request.args.get('id')
+    exp_id = request.args.get('id', type=int)
+    if not exp_id and experiments_with_analysis:
+        exp_id = experiments_with_analysis[0].id
 
     if exp_id:
-        selected_experiment = Experiment.query.get(exp_id)
+        selected_experiment = (Experiment.query
+                               .options(*loader_profile('detail'))
+                               .populate_existing()
+                               .get(exp_id))
         if selected_experiment:
             analysis = selected_experiment.analysis
-    elif experiments_with_analysis:
-        selected_experiment = experiments_with_analysis[0]
-        analysis = selected_experiment.analysis
 
     # Prepare detailed data
     if analysis:
         summary_data = analysis.emotion_summary
-        timeline_data = (analysis.timeline_segments
-                         .order_by(TimelineSegment.start_time)
-                         .all())
+        analysis_counts = analysis_child_stats([analysis.id])[analysis.id]
+        questions_preview = analysis.questions.limit(5).all()
+        actions_preview = analysis.actions.limit(5).all()
+        rows = (db.session.query(TimelineSegment.start_time,
+                                 TimelineSegment.primary_emotion,
+                                 TimelineSegment.confidence_score)
+                .filter(TimelineSegment.analysis_id == analysis.id)
+                .order_by(TimelineSegment.start_time)
+                .all())
+        timeline_total = len(rows)
+
+        # Only the downsampled curve is embedded in the page
+        indices, emotions = downsample_timeline(rows, request.args.get('points', type=int))
+        timeline_chart = {
+            'time': [rows[idx][0] for idx in indices],
+            'emotion': emotions,
+            'confidence': [rows[idx][2] for idx in indices]
+        }
+        timeline_data = _timeline_preview(analysis.id)
         keywords_data = (analysis.keywords
                         .order_by(Keyword.rank)
                         .limit(20)
@@ -232,16 +310,22 @@ def transcription():
         selected_experiment=selected_experiment,
         analysis=analysis,
         timeline=timeline_data,
+        timeline_chart=timeline_chart,
+        timeline_total=timeline_total,
         summary=summary_data,
-        keywords=keywords_data
+        keywords=keywords_data,
+        questions_preview=questions_preview,
+        actions_preview=actions_preview,
+        analysis_counts=analysis_counts
     )
 
 @views.route("/profile", methods=["GET", "POST"])
+@use_primary
 @login_required
 def profile():
     if request.method == "POST":
         current_password = request.form.get("password")
-        if not check_password_hash(current_user.password, current_password):
+        if not verify_password(current_user.password, current_password):
             flash("Incorrect password. Changes not saved.", category="error")
             return redirect(url_for("views.profile"))
 
@@ -251,22 +335,74 @@ def profile():
         user.last_name = request.form.get("lastName")
 
         db.session.commit()
+        invalidate_user(user.id)
         flash("Changes saved successfully!", category="success")
         return redirect(url_for("views.profile"))
 
     return render_template("profile.html", user=current_user)
 
 
+def analysis_conditional(view):
+    """
+    ETag / Last-Modified support for per-experiment analysis endpoints.
+    Imported analyses never change, so the validator is derived from
+    NlpAnalysis.id + generated_at (plus the query string) and a matching
+    request gets a 304 without the view, or any child table, being touched.
+    """
+    @wraps(view)
+    def wrapper(exp_id, *args, **kwargs):
+        validator = (db.session.query(NlpAnalysis.id, NlpAnalysis.generated_at)
+                     .filter(NlpAnalysis.experiment_id == exp_id)
+                     .first())
+        if validator is None:
+            return view(exp_id, *args, **kwargs)
+
+        analysis_id, generated_at = validator
+        key = f"{request.endpoint}:{analysis_id}:{generated_at.isoformat() if generated_at else ''}:" \
+              f"{sorted(request.args.items(multi=True))}"
+        etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        last_modified = (generated_at.replace(microsecond=0, tzinfo=timezone.utc)
+                         if generated_at else None)
+
+        def add_validators(response):
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            max_age = current_app.config.get('ANALYSIS_CACHE_MAX_AGE', 86400)
+            response.headers['Cache-Control'] = f"private, max-age={max_age}, immutable"
+            return response
+
+        # If-None-Match wins over If-Modified-Since when both are sent
+        if request.if_none_match:
+            # Weak comparison: compressed responses carry a weakened ETag
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            since = request.if_modified_since
+            not_modified = bool(since and last_modified and last_modified <= since)
+
+        if not_modified:
+            return add_validators(Response(status=304))
+
+        response = make_response(view(exp_id, *args, **kwargs))
+        if response.status_code == 200:
+            add_validators(response)
+        return response
+
+    return wrapper
+
+
 @views.route("/api/experiment/<int:exp_id>/analysis")
 @login_required
+@analysis_conditional
 def get_experiment_analysis(exp_id):
-    experiment = Experiment.query.get_or_404(exp_id)
+    experiment = Experiment.query.options(*loader_profile('detail')).get_or_404(exp_id)
     analysis = experiment.analysis
 
     if not analysis:
         return jsonify({"error": "No analysis found"}), 404
     
     summary = analysis.emotion_summary
+    counts = analysis_child_stats([analysis.id])[analysis.id]
     
     return jsonify({
         'id': analysis.id,
@@ -277,15 +413,162 @@ def get_experiment_analysis(exp_id):
         'dominant_emotion': analysis.dominant_emotion,
         'emotion_percentages': summary.emotion_percentages if summary else {},
         'emotion_counts': summary.emotion_counts if summary else {},
-        'timeline_points': analysis.timeline_segments.count(),
-        'questions_detected': analysis.questions.count(),
-        'actions_detected': analysis.actions.count(),
+        'timeline_points': counts['timeline_points'],
+        'questions_detected': counts['questions_detected'],
+        'actions_detected': counts['actions_detected'],
         'word_count': analysis.word_count,
         'reading_time': analysis.reading_time_minutes
     })
 
+# Rows fetched per round trip when streaming timeline responses
+TIMELINE_STREAM_CHUNK = 1000
+
+TIMELINE_KEYS = ('time', 'emotion', 'confidence', 'sentiment', 'text')
+CHART_KEYS = ('time', 'emotion', 'confidence')
+
+
+def _time_range():
+    """Parse optional ?start= / ?end= (seconds) from the request"""
+    return request.args.get('start', type=float), request.args.get('end', type=float)
+
+
+def _all_finite(*values):
+    # float() accepts "nan" and "inf", which no time range or bin width can use
+    return all(value is None or math.isfinite(value) for value in values)
+
+
+def _in_range(query, start=None, end=None):
+    # Served by the (analysis_id, start_time) index
+    if start is not None:
+        query = query.filter(TimelineSegment.start_time >= start)
+    if end is not None:
+        query = query.filter(TimelineSegment.start_time < end)
+    return query
+
+
+def _rebinned_timeline(analysis_id, bin_seconds, start=None, end=None):
+    """Aggregate segments into fixed-width bins in SQL, reading only the requested range"""
+    bin_index = func.floor(TimelineSegment.start_time / bin_seconds)
+    query = (db.session.query(
+                 bin_index.label('bin_index'),
+                 TimelineSegment.primary_emotion,
+                 func.count(TimelineSegment.id),
+                 func.sum(TimelineSegment.confidence_score),
+                 func.count(TimelineSegment.confidence_score))
+             .filter(TimelineSegment.analysis_id == analysis_id))
+    query = _in_range(query, start, end)
+    rows = (query.group_by(bin_index, TimelineSegment.primary_emotion)
+            .order_by(bin_index)
+            .all())
+    return assemble_bins(rows, bin_seconds)
+
+
+def _pyramid_bins(analysis_id, points=None):
+    """
+    Read the stored level-of-detail bins at the finest level within the point
+    budget (see pick_pyramid_level).
+    Analyses imported before the pyramid existed are re-binned in SQL at the
+    level the pyramid would have picked.
+    """
+    level_counts = dict(db.session.query(ChartBin.resolution, func.count(ChartBin.id))
+                        .filter(ChartBin.analysis_id == analysis_id,
+                                ChartBin.resolution.isnot(None))
+                        .group_by(ChartBin.resolution)
+                        .all())
+
+    if not level_counts:
+        duration = (db.session.query(func.max(TimelineSegment.end_time))
+                    .filter(TimelineSegment.analysis_id == analysis_id)
+                    .scalar()) or 0.0
+        estimated = {level: math.ceil(duration / level) for level in PYRAMID_LEVELS}
+        resolution = pick_pyramid_level(estimated, points)
+        return resolution, _rebinned_timeline(analysis_id, resolution)
+
+    resolution = pick_pyramid_level(level_counts, points)
+    bins = (ChartBin.query
+            .filter_by(analysis_id=analysis_id, resolution=resolution)
+            .order_by(ChartBin.bin_index)
+            .all())
+    return resolution, [{
+        'bin_index': b.bin_index,
+        'start_time': b.start_time,
+        'end_time': b.end_time,
+        'segments': sum((b.emotion_counts or {}).values()),
+        'emotion_counts': b.emotion_counts or {},
+        'emotion_percentages': b.emotion_percentages or {},
+        'dominant_emotion': b.dominant_emotion,
+        'mean_confidence': b.mean_confidence
+    } for b in bins]
+
+
+def _timeline_query(analysis_id, with_text=False, start=None, end=None):
+    """Column-only query over an analysis' segments, ordered by time"""
+    columns = [
+        TimelineSegment.start_time,
+        TimelineSegment.primary_emotion,
+        TimelineSegment.confidence_score
+    ]
+    if with_text:
+        columns += [
+            TimelineSegment.sentiment_label,
+            func.coalesce(func.substr(TimelineSegment.text_content, 1, 100), '')
+        ]
+    query = (db.session.query(*columns)
+             .filter(TimelineSegment.analysis_id == analysis_id))
+    return _in_range(query, start, end).order_by(TimelineSegment.start_time)
+
+
+def _timeline_preview(analysis_id, limit=10):
+    """First segments with their full text as light rows, for page previews"""
+    return (_timeline_query(analysis_id)
+            .add_columns(TimelineSegment.text_content)
+            .limit(limit)
+            .all())
+
+
+def _stream_timeline(query, keys, layout, head=None):
+    """
+    Stream timeline rows from a server-side cursor without building the full list.
+    Row layout streams a single JSON document; columnar layout streams NDJSON,
+    one {"time": [...], "emotion": [...], ...} object per chunk.
+    """
+    head = head or {}
+    rows = iter(query.yield_per(TIMELINE_STREAM_CHUNK))
+
+    def chunks():
+        while True:
+            chunk = list(islice(rows, TIMELINE_STREAM_CHUNK))
+            if not chunk:
+                return
+            yield chunk
+
+    if layout == 'columnar':
+        def generate():
+            if head:
+                yield json.dumps(head, separators=(',', ':')) + '\n'
+            for chunk in chunks():
+                columns = build_timeline_payload(chunk, keys, layout='columnar')
+                yield json.dumps(columns, separators=(',', ':')) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    def generate():
+        prefix = json.dumps(head, separators=(',', ':'))[:-1]
+        yield prefix + (',' if head else '') + '"timeline":['
+        first = True
+        for chunk in chunks():
+            points = build_timeline_payload(chunk, keys)
+            body = ','.join(json.dumps(point, separators=(',', ':')) for point in points)
+            yield body if first else ',' + body
+            first = False
+        yield ']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
 @views.route("/api/experiment/<int:exp_id>/timeline")
 @login_required
+@analysis_conditional
 def get_experiment_timeline(exp_id):
     experiment = Experiment.query.get_or_404(exp_id)
     analysis = experiment.analysis
@@ -293,22 +576,39 @@ def get_experiment_timeline(exp_id):
     if not analysis:
         return jsonify({"error": "No analysis found"}), 404
     
-    segments = analysis.timeline_segments.order_by(TimelineSegment.start_time).all()
+    start, end = _time_range()
+    if not _all_finite(start, end):
+        return jsonify({"error": "start and end must be finite numbers of seconds"}), 400
     
-    timeline_data = []
-    for seg in segments:
-        timeline_data.append({
-            'time': seg.start_time,
-            'emotion': seg.primary_emotion,
-            'confidence': seg.confidence_score,
-            'sentiment': seg.sentiment_label,
-            'text': seg.text_content[:100] if seg.text_content else ''
-        })
+    # ?bin=<seconds> re-bins the requested range instead of returning segments
+    bin_seconds = request.args.get('bin', type=float)
+    if bin_seconds is not None:
+        if not (_all_finite(bin_seconds) and bin_seconds > 0):
+            return jsonify({"error": "bin must be a positive number of seconds"}), 400
+        return jsonify({'bins': _rebinned_timeline(analysis.id, bin_seconds, start, end)})
+    
+    # ?layout=columnar returns one array per field, ?stream=1 streams the response
+    layout = request.args.get('layout', 'rows')
+    query = _timeline_query(analysis.id, with_text=True, start=start, end=end)
+    
+    if request.args.get('stream', type=int):
+        return _stream_timeline(query, TIMELINE_KEYS, layout)
     
-    return jsonify({'timeline': timeline_data})
+    rows = query.all()
+    
+    # Optional point budget (?points=1500) for chart consumers
+    indices, emotions = None, None
+    points = request.args.get('points', type=int)
+    if points:
+        indices, emotions = downsample_timeline(rows, points)
+    
+    timeline_data = build_timeline_payload(rows, TIMELINE_KEYS, indices, emotions, layout)
+    
+    return jsonify({'timeline': timeline_data, 'total_points': len(rows)})
 
 @views.route("/api/experiment/<int:exp_id>/charts")
 @login_required
+@analysis_conditional
 def get_experiment_charts(exp_id):
     experiment = Experiment.query.get_or_404(exp_id)
     analysis = experiment.analysis
@@ -317,25 +617,47 @@ def get_experiment_charts(exp_id):
         return jsonify({"error": "No analysis found"}), 404
     
     summary = analysis.emotion_summary
+    head = {
+        'emotion_distribution': summary.emotion_percentages if summary else {},
+        'primary_emotions': summary.primary_emotion_counts if summary else {}
+    }
     
-    timeline_data = []
-    segments = analysis.timeline_segments.order_by(TimelineSegment.start_time).all()
+    start, end = _time_range()
+    if not _all_finite(start, end):
+        return jsonify({"error": "start and end must be finite numbers of seconds"}), 400
     
-    for seg in segments:
-        timeline_data.append({
-            'time': seg.start_time,
-            'emotion': seg.primary_emotion,
-            'confidence': seg.confidence_score
-        })
+    bin_seconds = request.args.get('bin', type=float)
+    if bin_seconds is not None:
+        if not (_all_finite(bin_seconds) and bin_seconds > 0):
+            return jsonify({"error": "bin must be a positive number of seconds"}), 400
+        return jsonify({**head, 'bins': _rebinned_timeline(analysis.id, bin_seconds, start, end)})
+    
+    # ?resolution=auto reads the precomputed bin pyramid level fitting ?points=
+    if request.args.get('resolution') == 'auto':
+        resolution, bins = _pyramid_bins(analysis.id, request.args.get('points', type=int))
+        return jsonify({**head, 'resolution': resolution, 'bins': bins})
+    
+    layout = request.args.get('layout', 'rows')
+    query = _timeline_query(analysis.id, start=start, end=end)
+    
+    # Streaming returns the full-resolution timeline
+    if request.args.get('stream', type=int):
+        return _stream_timeline(query, CHART_KEYS, layout, head)
+    
+    rows = query.all()
+    
+    # Charts are always bounded by a point budget (?points=, default 1500)
+    indices, emotions = downsample_timeline(rows, request.args.get('points', type=int))
     
     return jsonify({
-        'emotion_distribution': summary.emotion_percentages if summary else {},
-        'timeline': timeline_data,
-        'primary_emotions': summary.primary_emotion_counts if summary else {}
+        **head,
+        'timeline': build_timeline_payload(rows, CHART_KEYS, indices, emotions, layout),
+        'total_points': len(rows)
     })
 
 @views.route("/api/experiment/<int:exp_id>/keywords")
 @login_required
+@analysis_conditional
 def get_experiment_keywords(exp_id):
     experiment = Experiment.query.get_or_404(exp_id)
     analysis = experiment.analysis
@@ -367,15 +689,506 @@ def get_experiment_metadata(exp_id):
         'analysis_id': experiment.analysis.id if experiment.analysis else None
     })
 
+# Upper bound on experiments resolved by a single batch request
+BATCH_MAX_EXPERIMENTS = 100
+BATCH_FIELDS = ('metadata', 'analysis', 'keywords')
+
+
+def _top_keywords(analysis_ids, limit=20):
+    """Top-ranked keywords for each analysis using one windowed query"""
+    keywords = {aid: [] for aid in analysis_ids}
+    if not analysis_ids:
+        return keywords
+
+    ranked = (select(
+                  Keyword.analysis_id, Keyword.text, Keyword.value, Keyword.relevance_score,
+                  func.row_number().over(
+                      partition_by=Keyword.analysis_id,
+                      order_by=Keyword.rank.asc()
+                  ).label('position'))
+              .where(Keyword.analysis_id.in_(analysis_ids))
+              .subquery())
+    rows = db.session.execute(
+        select(ranked)
+        .where(ranked.c.position <= limit)
+        .order_by(ranked.c.analysis_id, ranked.c.position)
+    )
+    for row in rows:
+        keywords[row.analysis_id].append({
+            'word': row.text,
+            'count': row.value,
+            'score': row.relevance_score
+        })
+    return keywords
+
+
+def _batch_list(value):
+    """A JSON list as-is, a string split on commas, anything else None"""
+    if isinstance(value, str):
+        return value.split(',')
+    if isinstance(value, list):
+        return value
+    return None
+
+
+def _batch_id(value):
+    # int() would truncate 1.5 and accept true/false
+    if isinstance(value, (bool, float)):
+        raise TypeError(value)
+    return int(value)
+
+
+@views.route("/api/experiments/batch", methods=["GET", "POST"])
+@login_required
+def get_experiments_batch():
+    """
+    Resolve metadata / analysis / keywords for several experiments at once.
+    Accepts ?ids=1,2,3&fields=metadata,analysis or a JSON body
+    {"ids": [...], "fields": [...]}. Runs a fixed number of queries
+    regardless of how many experiments are requested.
+    """
+    payload = request.get_json(silent=True)
+    if payload is not None and not isinstance(payload, dict):
+        return jsonify({"error": "JSON body must be an object"}), 400
+    payload = payload or {}
+    ids = _batch_list(payload.get('ids') or request.args.get('ids', ''))
+    fields = _batch_list(payload.get('fields') or request.args.get('fields', ','.join(BATCH_FIELDS)))
+    if ids is None or fields is None:
+        return jsonify({"error": "ids and fields must be lists or comma-separated strings"}), 400
+
+    try:
+        ids = list(dict.fromkeys(_batch_id(i) for i in ids if str(i).strip()))
+    except (TypeError, ValueError):
+        return jsonify({"error": "ids must be integers"}), 400
+    if not all(isinstance(f, str) for f in fields):
+        return jsonify({"error": "fields must be strings"}), 400
+    fields = [f.strip() for f in fields if f.strip()]
+
+    unknown = [f for f in fields if f not in BATCH_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+    if not ids:
+        return jsonify({"error": "No experiment ids given"}), 400
+    if len(ids) > BATCH_MAX_EXPERIMENTS:
+        return jsonify({"error": f"At most {BATCH_MAX_EXPERIMENTS} experiments per request"}), 400
+
+    # 1 query: experiments with analysis and emotion summary eagerly joined
+    experiments = (Experiment.query
+                   .options(*loader_profile('detail'))
+                   .filter(Experiment.id.in_(ids))
+                   .all())
+    by_id = {exp.id: exp for exp in experiments}
+    analysis_ids = [exp.analysis.id for exp in experiments if exp.analysis]
+
+    # 1 query each: grouped child counts and windowed top keywords
+    child_stats = (analysis_child_stats(analysis_ids)
+                   if {'metadata', 'analysis'} & set(fields) else {})
+    keywords = _top_keywords(analysis_ids) if 'keywords' in fields else {}
+
+    results = []
+    for exp_id in ids:
+        experiment = by_id.get(exp_id)
+        if experiment is None:
+            continue
+        analysis = experiment.analysis
+        stats = child_stats.get(analysis.id, {}) if analysis else {}
+        entry = {'id': experiment.id}
+
+        if 'metadata' in fields:
+            duration = experiment.duration
+            if duration is None and stats.get('max_end_time') and stats.get('timeline_points'):
+                duration = int(stats['max_end_time'] / 60)
+            entry['metadata'] = {
+                'title': experiment.title,
+                'date': experiment.date.strftime('%B %d, %Y'),
+                'participants': experiment.participant_count or 0,
+                'duration': Experiment.format_minutes(duration),
+                'status': experiment.status,
+                'has_analysis': analysis is not None,
+                'analysis_id': analysis.id if analysis else None
+            }
+
+        if 'analysis' in fields:
+            entry['analysis'] = None
+            if analysis:
+                summary = analysis.emotion_summary
+                entry['analysis'] = {
+                    'id': analysis.id,
+                    'source': analysis.source_filename,
+                    'generated_at': analysis.generated_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    'analyzed_at': analysis.analyzed_at.strftime('%Y-%m-%d %H:%M:%S') if analysis.analyzed_at else None,
+                    'total_segments': analysis.total_segments,
+                    'dominant_emotion': analysis.dominant_emotion,
+                    'emotion_percentages': summary.emotion_percentages if summary else {},
+                    'emotion_counts': summary.emotion_counts if summary else {},
+                    'timeline_points': stats['timeline_points'],
+                    'questions_detected': stats['questions_detected'],
+                    'actions_detected': stats['actions_detected'],
+                    'word_count': analysis.word_count,
+                    'reading_time': analysis.reading_time_minutes
+                }
+
+        if 'keywords' in fields:
+            entry['keywords'] = None
+            if analysis:
+                entry['keywords'] = {
+                    'keywords': keywords[analysis.id],
+                    'total_words': analysis.word_count or 0,
+                    'unique_words': analysis.unique_words_count or 0
+                }
+
+        results.append(entry)
+
+    return jsonify({
+        'experiments': results,
+        'missing': [exp_id for exp_id in ids if exp_id not in by_id]
+    })
+
+def _export_response(dataset, fmt, analysis_ids, name):
+    """Stream one dataset for the given analysis ids subquery as CSV or Parquet"""
+    if dataset not in EXPORT_DATASETS:
+        return jsonify({"error": f"Unknown dataset, use one of: {', '.join(EXPORT_DATASETS)}"}), 404
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unknown format, use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    columns = export_columns(dataset)
+    query = export_query(dataset, analysis_ids)
+    filename = f"{name}-{dataset}.{fmt}"
+
+    if fmt == 'parquet':
+        path = write_parquet(query, columns)
+        response = send_file(path, mimetype='application/vnd.apache.parquet',
+                             as_attachment=True, download_name=filename)
+        response.call_on_close(lambda: parquet_cleanup(path))
+        return response
+
+    response = Response(stream_with_context(stream_csv(query, columns)), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@views.route("/api/experiment/<int:exp_id>/export/<dataset>.<fmt>")
+@login_required
+def export_experiment(exp_id, dataset, fmt):
+    """Export timeline segments, chart bins, keywords, questions or actions of one experiment"""
+    experiment = db.session.get(Experiment, exp_id)
+    if not experiment:
+        return jsonify({"error": "Experiment not found"}), 404
+    return _export_response(dataset, fmt, experiment_filter(ids=[exp_id]), f"experiment-{exp_id}")
+
+
+@views.route("/api/experiments/export/<dataset>.<fmt>")
+@login_required
+def export_experiments(dataset, fmt):
+    """
+    Export a dataset for a filtered set of experiments:
+    ?ids=1,2,3&tag=Sweet&status=Completed&from=2025-01-01&to=2025-06-30
+    """
+    try:
+        ids = [int(i) for i in request.args.get('ids', '').split(',') if i.strip()]
+        date_from = datetime.strptime(request.args['from'], '%Y-%m-%d') if request.args.get('from') else None
+        date_to = datetime.strptime(request.args['to'], '%Y-%m-%d') if request.args.get('to') else None
+    except ValueError:
+        return jsonify({"error": "ids must be integers and from/to dates YYYY-MM-DD"}), 400
+
+    analysis_ids = experiment_filter(ids=ids, tag=request.args.get('tag'),
+                                     status=request.args.get('status'),
+                                     date_from=date_from, date_to=date_to)
+    return _export_response(dataset, fmt, analysis_ids, "experiments")
+
+
+@views.route("/api/experiment/<int:exp_id>/transitions")
+@login_required
+def get_experiment_transitions(exp_id):
+    """Precomputed emotion transition matrix, run lengths and stability score"""
+    row = (db.session.query(NlpAnalysis.id, EmotionSummary.emotion_transitions,
+                            EmotionSummary.stability_score)
+           .join(EmotionSummary, EmotionSummary.analysis_id == NlpAnalysis.id)
+           .filter(NlpAnalysis.experiment_id == exp_id)
+           .first())
+    
+    if not row:
+        return jsonify({"error": "No analysis found"}), 404
+    
+    analysis_id, transitions, stability = row
+    if transitions is None:
+        return jsonify({"error": "Transitions not computed yet, run 'flask backfill-emotion-flow'"}), 404
+    
+    return jsonify({
+        'analysis_id': analysis_id,
+        'stability_score': stability,
+        'transitions': transitions
+    })
+
+@views.route("/api/experiment/<int:exp_id>/similar")
+@login_required
+def get_similar_experiments(exp_id):
+    """Experiments with the closest emotion distribution (?metric=cosine|jensen_shannon)"""
+    metric = request.args.get('metric', 'cosine')
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    if metric not in SIMILARITY_METRICS:
+        return jsonify({"error": f"metric must be one of: {', '.join(SIMILARITY_METRICS)}"}), 400
+    
+    matches = similarity_index.similar(exp_id, metric=metric, limit=limit)
+    if matches is None:
+        return jsonify({"error": "No emotion summary found"}), 404
+    
+    titles = dict(db.session.query(Experiment.id, Experiment.title)
+                  .filter(Experiment.id.in_([match_id for match_id, _ in matches]))
+                  .all())
+    
+    return jsonify({
+        'metric': metric,
+        'similar': [{
+            'id': match_id,
+            'title': titles.get(match_id),
+            'distance': round(distance, 4)
+        } for match_id, distance in matches]
+    })
+
+# Ranked transcript search results per page
+SEARCH_PAGE_SIZE = 20
+
+# ts_headline match delimiters; control characters so the highlighted text can
+# be HTML-escaped before they are turned into <mark> tags
+HEADLINE_START, HEADLINE_STOP = '\x02', '\x03'
+
+
+def _highlight_html(headline):
+    """Escape a ts_headline fragment and mark its matches"""
+    return str(escape(headline or '')).replace(HEADLINE_START, '<mark>').replace(HEADLINE_STOP, '</mark>')
+
+
+@views.route("/api/search/transcripts")
+@login_required
+def search_transcripts():
+    """
+    Full-text search over every transcript segment.
+    ?q= uses web search syntax ("too salty", -sweet, salty OR bitter),
+    ?experiment_id= narrows to one experiment, ?after=<cursor> fetches the next page.
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({"error": "Missing search query"}), 400
+    limit = request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+    if limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    limit = min(limit, 100)
+    experiment_id = request.args.get('experiment_id', type=int)
+
+    ts_query = func.websearch_to_tsquery('english', q)
+    # ts_rank_cd returns float4; as float8 the cursor's Python float compares
+    # exactly, so rows tied on rank aren't skipped between pages
+    rank = cast(func.ts_rank_cd(TimelineSegment.text_search, ts_query), Float)
+
+    # Rank and page on the GIN index first, headline only the rows returned
+    hits = (db.session.query(TimelineSegment.id.label('segment_id'), rank.label('rank'))
+            .join(NlpAnalysis, NlpAnalysis.id == TimelineSegment.analysis_id)
+            .filter(TimelineSegment.text_search.op('@@')(ts_query),
+                    NlpAnalysis.experiment_id.isnot(None)))
+    if experiment_id:
+        hits = hits.filter(NlpAnalysis.experiment_id == experiment_id)
+
+    # Keyset pagination on (rank, id), both descending
+    after = request.args.get('after')
+    if after:
+        try:
+            after_rank, after_id = after.split(':')
+            after_rank, after_id = float(after_rank), int(after_id)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        hits = hits.filter(tuple_(rank, TimelineSegment.id) < tuple_(after_rank, after_id))
+
+    hits = hits.order_by(rank.desc(), TimelineSegment.id.desc()).limit(limit).subquery()
+
+    # Transcript text is escaped in Python, so strip stray delimiters from it first
+    headline = func.ts_headline(
+        'english', func.translate(TimelineSegment.text_content, HEADLINE_START + HEADLINE_STOP, ''),
+        ts_query,
+        f'StartSel="{HEADLINE_START}", StopSel="{HEADLINE_STOP}", MaxFragments=2, MaxWords=25, MinWords=8'
+    )
+    rows = (db.session.query(hits.c.segment_id, hits.c.rank, headline,
+                             TimelineSegment.start_time, TimelineSegment.end_time,
+                             TimelineSegment.primary_emotion, TimelineSegment.sentiment_label,
+                             TimelineSegment.confidence_score,
+                             Experiment.id, Experiment.title)
+            .join(TimelineSegment, TimelineSegment.id == hits.c.segment_id)
+            .join(NlpAnalysis, NlpAnalysis.id == TimelineSegment.analysis_id)
+            .join(Experiment, Experiment.id == NlpAnalysis.experiment_id)
+            .order_by(hits.c.rank.desc(), hits.c.segment_id.desc())
+            .all())
+
+    results = [{
+        'segment_id': segment_id,
+        'rank': round(hit_rank, 4),
+        'highlight': _highlight_html(highlight),
+        'start_time': start_time,
+        'end_time': end_time,
+        'emotion': emotion,
+        'sentiment': sentiment,
+        'confidence': confidence,
+        'experiment': {'id': exp_id, 'title': title}
+    } for (segment_id, hit_rank, highlight, start_time, end_time,
+           emotion, sentiment, confidence, exp_id, title) in rows]
+
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = f"{rows[-1][1]!r}:{rows[-1][0]}"
+
+    return jsonify({'query': q, 'results': results, 'next': next_cursor})
+
+@views.route("/api/keywords/top")
+@login_required
+def get_top_keywords():
+    """
+    Corpus-level top-k keywords from the incremental rollups.
+    ?tag= restricts to one experiment tag, ?start= / ?end= (YYYY-MM-DD, inclusive)
+    to an experiment date range, ?order=df|count|relevance.
+    """
+    k = request.args.get('k', 20, type=int)
+    if k < 1:
+        return jsonify({"error": "k must be a positive integer"}), 400
+    k = min(k, 200)
+    tag = request.args.get('tag')
+    start = request.args.get('start')
+    end = request.args.get('end')
+    
+    if tag and (start or end):
+        return jsonify({"error": "Filter by tag or by date range, not both"}), 400
+    
+    document_frequency = func.sum(KeywordRollup.document_frequency)
+    total_count = func.sum(KeywordRollup.total_count)
+    relevance_sum = func.sum(KeywordRollup.relevance_sum)
+    order = {
+        'df': (document_frequency.desc(), total_count.desc()),
+        'count': (total_count.desc(), document_frequency.desc()),
+        'relevance': ((relevance_sum / document_frequency).desc(), document_frequency.desc())
+    }.get(request.args.get('order', 'df'))
+    if order is None:
+        return jsonify({"error": "order must be one of: df, count, relevance"}), 400
+    
+    query = db.session.query(KeywordRollup.term, document_frequency, total_count, relevance_sum)
+    if tag:
+        query = query.filter(KeywordRollup.scope == 'tag', KeywordRollup.scope_key == tag)
+    elif start or end:
+        # Day keys are ISO dates, so string comparison is chronological
+        query = query.filter(KeywordRollup.scope == 'day')
+        if start:
+            query = query.filter(KeywordRollup.scope_key >= start)
+        if end:
+            query = query.filter(KeywordRollup.scope_key <= end)
+    else:
+        query = query.filter(KeywordRollup.scope == 'all')
+    
+    rows = query.group_by(KeywordRollup.term).order_by(*order).limit(k).all()
+    
+    return jsonify({'keywords': [{
+        'term': term,
+        'document_frequency': int(df),
+        'total_count': int(count or 0),
+        'mean_relevance': round((relevance or 0.0) / df, 4) if df else 0.0
+    } for term, df, count, relevance in rows]})
+
+
+@views.route("/api/keywords/<path:term>/experiments")
+@login_required
+def get_keyword_experiments(term):
+    """Experiments whose analysis contains a keyword, most relevant first"""
+    rows = (db.session.query(Experiment.id, Experiment.title, Experiment.date,
+                             KeywordPosting.value, KeywordPosting.relevance_score)
+            .join(KeywordPosting, KeywordPosting.experiment_id == Experiment.id)
+            .filter(KeywordPosting.term == normalize_term(term))
+            .order_by(KeywordPosting.relevance_score.desc())
+            .all())
+    
+    return jsonify({
+        'term': normalize_term(term),
+        'experiments': [{
+            'id': exp_id,
+            'title': title,
+            'date': date.strftime('%Y-%m-%d') if date else None,
+            'count': value,
+            'relevance': relevance
+        } for exp_id, title, date, value, relevance in rows]
+    })
+
+@views.route("/api/trends/emotions")
+@login_required
+def get_emotion_trends():
+    """
+    Emotion and sentiment over time from the incremental trend rollups.
+    ?granularity=day|week (default week), ?tag= restricts to one experiment tag,
+    ?start= / ?end= (YYYY-MM-DD, inclusive) bound the buckets. Percentages and
+    means are weighted by segment; experiments is the number of analyses per bucket.
+    """
+    granularity = request.args.get('granularity', 'week')
+    if granularity not in TREND_GRANULARITIES:
+        return jsonify({"error": "granularity must be one of: day, week"}), 400
+    tag = request.args.get('tag')
+    
+    try:
+        start, end = [datetime.strptime(request.args[key], '%Y-%m-%d').date()
+                      if request.args.get(key) else None for key in ('start', 'end')]
+    except ValueError:
+        return jsonify({"error": "start and end must be dates as YYYY-MM-DD"}), 400
+    
+    query = (db.session.query(EmotionTrend)
+             .filter(EmotionTrend.scope == ('tag' if tag else 'all'),
+                     EmotionTrend.scope_key == (tag or ''),
+                     EmotionTrend.granularity == granularity))
+    if start:
+        query = query.filter(EmotionTrend.bucket_start >= start)
+    if end:
+        query = query.filter(EmotionTrend.bucket_start <= end)
+    
+    buckets = {}
+    for row in query.order_by(EmotionTrend.bucket_start, EmotionTrend.emotion):
+        bucket = buckets.setdefault(row.bucket_start, {
+            'segments': {}, 'dominant': {}, 'experiments': 0,
+            'confidence': 0.0, 'sentiment': 0.0, 'positive': 0, 'negative': 0
+        })
+        if row.segment_count:
+            bucket['segments'][row.emotion] = row.segment_count
+        if row.experiment_count:
+            bucket['dominant'][row.emotion] = row.experiment_count
+        bucket['experiments'] += row.experiment_count or 0
+        bucket['confidence'] += row.confidence_sum or 0.0
+        bucket['sentiment'] += row.sentiment_sum or 0.0
+        bucket['positive'] += row.positive_segments or 0
+        bucket['negative'] += row.negative_segments or 0
+    
+    def share(value, total):
+        return round(value / total, 4) if total else 0.0
+    
+    trend = []
+    for bucket_start, bucket in buckets.items():
+        total = sum(bucket['segments'].values())
+        trend.append({
+            'start': bucket_start.strftime('%Y-%m-%d'),
+            'experiments': bucket['experiments'],
+            'segments': total,
+            'emotion_percentages': {emotion: round(count / total * 100, 2)
+                                    for emotion, count in bucket['segments'].items()},
+            'dominant_emotions': bucket['dominant'],
+            'mean_confidence': share(bucket['confidence'], total),
+            'mean_sentiment_score': share(bucket['sentiment'], total),
+            'positive_share': share(bucket['positive'], total),
+            'negative_share': share(bucket['negative'], total)
+        })
+    
+    return jsonify({'granularity': granularity, 'tag': tag, 'buckets': trend})
+
 @views.route("/analytics")
 @login_required
 def analytics():
     """Advanced analytics page showing all analysis results"""
     
     # Get all experiments with analysis
-    experiments_with_analysis = Experiment.query.join(NlpAnalysis).order_by(
-        Experiment.date.desc()
-    ).all()
+    experiments_with_analysis = (Experiment.query
+                                 .join(NlpAnalysis)
+                                 .options(*loader_profile('detail'))
+                                 .order_by(Experiment.date.desc())
+                                 .all())
     
     emotion_aggregates = {}
     total_segments = 0
@@ -406,24 +1219,44 @@ def detection_tracking():
 @views.route('/admin/sync-minio', methods=['POST'])
 @login_required
 def manual_sync():
-    """Manual trigger for MinIO sync"""
-    try:
-        from sync.minio_sync import sync_new_analyses
-        # Call without max_imports to import all available files
-        result = sync_new_analyses(max_imports=None)
-        
-        message = (f"Sync complete in {result['duration']}s: "
-                  f"{result['new_imports']} new analyses imported, "
-                  f"{result['skipped']} already exist")
-        
-        if result['errors'] > 0:
-            message += f", {result['errors']} errors (check logs)"
-        
-        flash(message, category="success" if result['errors'] == 0 else "warning")
-        
-    except Exception as e:
-        flash(f"Sync failed: {str(e)}", category="error")
-        import traceback
-        print(traceback.format_exc())
-    
-    return redirect(request.referrer or url_for('views.experiments'))
\ No newline at end of file
+    """Manual trigger for MinIO sync, imported in the background"""
+    # Without max_imports all available files are imported
+    job, created = start_sync_job(max_imports=None)
+
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({
+            'job': job.to_dict(),
+            'created': created,
+            'status_url': url_for('views.sync_job_status', job_id=job.id),
+            'poll_interval': SYNC_POLL_INTERVAL
+        }), 202
+
+    if created:
+        flash("Sync started in the background. New analyses will appear as they are imported.",
+              category="success")
+    else:
+        flash("A sync is already running.", category="warning")
+    return redirect(request.referrer or url_for('views.experiments'))
+
+
+# Seconds clients should wait between status polls while a job is active.
+# Progress is polled with short requests rather than streamed, so no web
+# worker is held for the length of an import.
+SYNC_POLL_INTERVAL = 2
+
+
+@views.route('/admin/sync-jobs/<job_id>')
+@use_primary
+@login_required
+def sync_job_status(job_id):
+    """The job's progress; poll again after Retry-After seconds while it is active"""
+    job = db.session.get(SyncJob, job_id)
+    if not job:
+        return jsonify({'error': 'Sync job not found'}), 404
+    # An active job that stopped reporting belongs to a dead worker; stop polling it
+    stale = job.updated_at and job.updated_at < datetime.utcnow() - STALE_AFTER
+    response = jsonify(dict(job.to_dict(), stale=bool(stale)))
+    response.headers['Cache-Control'] = 'no-store'
+    if job.status in SyncJob.ACTIVE and not stale:
+        response.headers['Retry-After'] = str(SYNC_POLL_INTERVAL)
+    return response
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production servers:
+
+    gunicorn wsgi:app
+
+Built without Flask-Migrate; run schema migrations with `flask --app main db upgrade`.
+"""
+from main import create_app
+
+app = create_app(migrations=False)